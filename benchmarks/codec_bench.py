@@ -0,0 +1,91 @@
+"""HUB codec benchmark'ı.
+
+data/servers.json'daki sunucu kayıtlarından gerçekçi HUB mesajları (tam liste,
+yalnızca özet alanlı liste, tekil upsert, heartbeat) üretir ve her codec için
+çerçeve boyutunu, JSON'a göre oranını ve kodlama/çözme sürelerini ölçer.
+
+Kullanım:
+    python -m benchmarks.codec_bench [--servers 200] [--repeat 50]
+"""
+import argparse
+import copy
+import json
+import os
+import random
+import time
+
+from core import codec, details
+from utils.helper import create_message
+
+SERVERS_JSON = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "servers.json")
+IDENTIFIER = "3f2b8c1e-9a4d-4e7b-8c21-5d6f0a9b7e13"
+
+
+def make_servers(count, rng):
+    """servers.json kayıtlarını çoğaltıp ID, isim, oyuncu ve ping değerlerini çeşitlendirir."""
+    with open(SERVERS_JSON) as f:
+        templates = json.load(f)["network"]
+    servers = []
+    for i in range(count):
+        server = copy.deepcopy(templates[i % len(templates)])
+        server["ID"] = i + 1
+        server["name"] = f"{server['name']} #{i + 1}"
+        server["players"] = rng.randint(0, server["max_players"])
+        server["ping"] = rng.randint(20, 200)
+        server["ping_last_1_hours"] = [rng.randint(20, 200) for _ in server["ping_last_1_hours"]]
+        server["rank"] = {f"player_{rng.randint(1, 99999)}": rng.randint(1, 140) for _ in server["rank"]}
+        servers.append(server)
+    return servers
+
+
+def make_messages(count, seed=3131):
+    rng = random.Random(seed)
+    servers = make_servers(count, rng)
+    return {
+        "servers": create_message(IDENTIFIER, "request", {"value": "servers", "data": servers}),
+        "servers_summary": create_message(
+            IDENTIFIER, "request", {"value": "servers", "data": [details.summary(server) for server in servers]}
+        ),
+        "upsert": create_message(IDENTIFIER, "server_upsert", {"data": servers[0], "version": 7}),
+        "heartbeat": create_message(IDENTIFIER, "Heartbeat", {}),
+    }
+
+
+def measure(instance, message, repeat):
+    payload = instance.frame(message)
+    body = instance.encode(message)
+    start = time.perf_counter()
+    for _ in range(repeat):
+        instance.encode(message)
+    encode_us = (time.perf_counter() - start) / repeat * 1e6
+    start = time.perf_counter()
+    for _ in range(repeat):
+        decoded = instance.decode(body)
+    decode_us = (time.perf_counter() - start) / repeat * 1e6
+    if decoded != message:
+        raise AssertionError(f"{instance.name} mesajı bozdu")
+    return len(payload), encode_us, decode_us
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--servers", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    messages = make_messages(args.servers)
+    codecs = codec.available()
+    print(f"msgpack modülü: {'var' if codec.msgpack else 'yok (saf Python)'}, "
+          f"zstandard: {'var' if codec.zstandard else 'yok'}")
+    for kind, message in messages.items():
+        baseline = None
+        print(f"\n[{kind}]")
+        for name in ["json", *[n for n in codecs if n != "json"]]:
+            size, encode_us, decode_us = measure(codecs[name], message, args.repeat)
+            baseline = baseline or size
+            print(f"  {name:<14} {size:>9} byte  %{size / baseline * 100:6.1f}  "
+                  f"encode {encode_us:10.1f} us  decode {decode_us:10.1f} us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+"""Gateway relay benchmark: yerel echo upstream üzerinden throughput ve gecikme ölçer.
+
+Kullanım:
+    python -m benchmarks.gateway_relay [--clients 8] [--mb 16] [--pings 2000]
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+from core import relay
+from core.ClientHub import Gateway
+
+
+class LegacyGateway(Gateway):
+    """Eski 32 byte'lık, her parçada drain() bekleyen forward döngüsü."""
+
+    async def forward(self, reader, writer, direction="up", counter=None, tracker=None):
+        total = 0
+        try:
+            while data := await reader.read(32):
+                hex_data = data.hex()
+                writer.write(data)
+                await writer.drain()
+                total += len(data)
+                if counter is not None:
+                    counter.value = total
+        finally:
+            writer.close()
+        return total
+
+
+async def echo_handler(reader, writer):
+    try:
+        while data := await reader.read(relay.BUFFER_SIZE):
+            writer.write(data)
+            await writer.drain()
+    except (ConnectionError, asyncio.CancelledError):
+        # asyncio.run kapanışta kalan handler'ları iptal eder; iptal yutulmazsa her biri hata loglar.
+        pass
+    finally:
+        writer.close()
+
+
+async def start_gateway(cls, upstream_port):
+    gw = cls(["127.0.0.1"], upstream_port, None, local_port=0)
+    gw.GW_IP = "127.0.0.1"
+    task = asyncio.create_task(gw.serve())
+    while gw.server is None:
+        await asyncio.sleep(0.01)
+    return gw, task, gw.server.sockets[0].getsockname()[1]
+
+
+async def throughput_client(port, total_bytes, chunk=16 * 1024):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    payload = b"\x00" * chunk
+
+    async def sender():
+        sent = 0
+        while sent < total_bytes:
+            writer.write(payload)
+            await writer.drain()
+            sent += chunk
+
+    send_task = asyncio.create_task(sender())
+    received = 0
+    while received < total_bytes:
+        data = await reader.read(relay.BUFFER_SIZE)
+        if not data:
+            break
+        received += len(data)
+    await send_task
+    writer.close()
+    return received
+
+
+async def latency_client(port, count, size=64):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    payload = b"\x01" * size
+    samples = []
+    for _ in range(count):
+        start = time.perf_counter()
+        writer.write(payload)
+        await reader.readexactly(size)
+        samples.append((time.perf_counter() - start) * 1000)
+    writer.close()
+    return samples
+
+
+def percentile(samples, q):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * q))]
+
+
+async def run_mode(name, cls, args, upstream_port):
+    gw, task, port = await start_gateway(cls, upstream_port)
+    total = args.mb * 1024 * 1024
+    start = time.perf_counter()
+    cpu_start = time.process_time()
+    results = await asyncio.gather(*(throughput_client(port, total) for _ in range(args.clients)))
+    elapsed = time.perf_counter() - start
+    cpu = time.process_time() - cpu_start
+    moved = sum(results) / (1024 * 1024)
+    samples = await latency_client(port, args.pings)
+    print(f"[{name}] {args.clients} istemci, {moved:.0f} MB: {moved / elapsed:.1f} MB/s, "
+          f"CPU {cpu / moved * 1000:.2f} ms/MB | RTT p50 {statistics.median(samples):.3f} ms "
+          f"p99 {percentile(samples, 0.99):.3f} ms")
+    await gw.stop()
+    task.cancel()
+    await asyncio.gather(task, return_exceptions=True)
+
+
+async def main(args):
+    upstream = await asyncio.start_server(echo_handler, "127.0.0.1", 0)
+    upstream_port = upstream.sockets[0].getsockname()[1]
+    if not args.skip_legacy:
+        await run_mode("legacy", LegacyGateway, args, upstream_port)
+    await run_mode("relay", Gateway, args, upstream_port)
+    upstream.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--clients", type=int, default=8)
+    parser.add_argument("--mb", type=int, default=16, help="istemci başına gönderilecek MB")
+    parser.add_argument("--pings", type=int, default=2000)
+    parser.add_argument("--skip-legacy", action="store_true")
+    asyncio.run(main(parser.parse_args()))
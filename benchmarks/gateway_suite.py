@@ -0,0 +1,264 @@
+"""Gateway benchmark paketi.
+
+Sahte upstream'ler (echo, delayed, lossy, flaky) ve Gateway ayrı bir işlemde
+çalışır; bu işlemde N eşzamanlı oyun istemcisi simüle edilir. Her senaryo için
+bağlantı gecikmesi yüzdelikleri, relay throughput'u, MB başına CPU ve
+bağlantı başına bellek ölçülür ve sonuçlar JSON'a yazılır.
+
+Kullanım:
+    python -m benchmarks.gateway_suite [--clients 50] [--mb 2] [--output gateway_bench.json]
+    python -m benchmarks.gateway_suite --compare eski.json
+"""
+import argparse
+import asyncio
+import json
+import multiprocessing
+import platform
+import statistics
+import subprocess
+import time
+
+import psutil
+
+from benchmarks import upstreams
+
+SCENARIOS = {
+    "echo": ("echo", {}),
+    "delayed": ("delayed", {"delay_ms": 20}),
+    "lossy": ("lossy", {"reset_chance": 0.001}),
+    "flaky": ("flaky", {"drop_chance": 0.3, "accept_delay_ms": 300}),
+}
+CLIENT_TIMEOUT = 60
+
+
+def gateway_process(kind, options, ready, stop):
+    from core.ClientHub import Gateway
+
+    async def main():
+        _, upstream_port = await upstreams.start(kind, **options)
+        gw = Gateway(["127.0.0.1"], upstream_port, None, local_port=0)
+        gw.GW_IP = "127.0.0.1"
+        await gw.listen()
+        ready.put(gw.local_port)
+        while not stop.is_set():
+            await asyncio.sleep(0.2)
+        await gw.stop()
+
+    asyncio.run(main())
+
+
+def percentiles(samples):
+    if not samples:
+        return {}
+    ordered = sorted(samples)
+    pick = lambda q: ordered[min(len(ordered) - 1, int(len(ordered) * q))]
+    return {
+        "p50": round(pick(0.50), 3),
+        "p90": round(pick(0.90), 3),
+        "p99": round(pick(0.99), 3),
+        "max": round(ordered[-1], 3),
+        "mean": round(statistics.fmean(ordered), 3),
+    }
+
+
+class SimClient:
+    """Gateway'e bağlanıp karşılama paketini bekleyen simüle oyun istemcisi."""
+
+    def __init__(self, port):
+        self.port = port
+        self.reader = self.writer = None
+        self.connect_ms = None
+
+    async def connect(self):
+        start = time.perf_counter()
+        self.reader, self.writer = await asyncio.open_connection("127.0.0.1", self.port)
+        await self.reader.readexactly(len(upstreams.HELLO))
+        self.connect_ms = (time.perf_counter() - start) * 1000
+
+    async def bulk(self, total, chunk=16 * 1024):
+        payload = b"\x00" * chunk
+
+        async def sender():
+            sent = 0
+            while sent < total:
+                self.writer.write(payload)
+                await self.writer.drain()
+                sent += chunk
+
+        send_task = asyncio.create_task(sender())
+        received = 0
+        try:
+            while received < total:
+                data = await self.reader.read(64 * 1024)
+                if not data:
+                    break
+                received += len(data)
+        finally:
+            send_task.cancel()
+            await asyncio.gather(send_task, return_exceptions=True)
+        return received
+
+    async def ping(self, count, size=64):
+        payload = b"\x01" * size
+        samples = []
+        for _ in range(count):
+            start = time.perf_counter()
+            self.writer.write(payload)
+            await self.reader.readexactly(size)
+            samples.append((time.perf_counter() - start) * 1000)
+        return samples
+
+    def close(self):
+        if self.writer:
+            self.writer.close()
+
+
+async def run_scenario(port, proc, args):
+    result = {"clients": args.clients, "errors": {}}
+
+    def fail(stage, exc):
+        key = f"{stage}:{type(exc).__name__}"
+        result["errors"][key] = result["errors"].get(key, 0) + 1
+
+    rss_before = proc.memory_info().rss
+    clients = [SimClient(port) for _ in range(args.clients)]
+    outcomes = await asyncio.gather(
+        *(asyncio.wait_for(c.connect(), CLIENT_TIMEOUT) for c in clients),
+        return_exceptions=True
+    )
+    connected = []
+    for client, outcome in zip(clients, outcomes):
+        if isinstance(outcome, Exception):
+            fail("connect", outcome)
+            client.close()
+        else:
+            connected.append(client)
+    await asyncio.sleep(0.5)
+    rss_after = proc.memory_info().rss
+    result["connected"] = len(connected)
+    result["connect_ms"] = percentiles([c.connect_ms for c in connected])
+    result["memory_per_connection_kb"] = round((rss_after - rss_before) / max(1, len(connected)) / 1024, 2)
+
+    total = int(args.mb * 1024 * 1024)
+    cpu_before = sum(proc.cpu_times()[:2])
+    start = time.perf_counter()
+    outcomes = await asyncio.gather(
+        *(asyncio.wait_for(c.bulk(total), CLIENT_TIMEOUT) for c in connected),
+        return_exceptions=True
+    )
+    elapsed = time.perf_counter() - start
+    cpu = sum(proc.cpu_times()[:2]) - cpu_before
+    moved = 0
+    alive = []
+    for client, outcome in zip(connected, outcomes):
+        if isinstance(outcome, Exception):
+            fail("bulk", outcome)
+            client.close()
+            continue
+        moved += outcome
+        if outcome >= total:
+            alive.append(client)
+    moved_mb = moved / (1024 * 1024)
+    result["relay_mb"] = round(moved_mb, 2)
+    result["throughput_mb_s"] = round(moved_mb / elapsed, 2) if elapsed else 0
+    result["cpu_ms_per_mb"] = round(cpu * 1000 / moved_mb, 3) if moved_mb else None
+
+    samples = []
+    for outcome in await asyncio.gather(
+        *(asyncio.wait_for(c.ping(args.pings), CLIENT_TIMEOUT) for c in alive[:args.ping_clients]),
+        return_exceptions=True
+    ):
+        if isinstance(outcome, Exception):
+            fail("ping", outcome)
+        else:
+            samples.extend(outcome)
+    result["rtt_ms"] = percentiles(samples)
+
+    for client in clients:
+        client.close()
+    return result
+
+
+def run(name, args):
+    kind, options = SCENARIOS[name]
+    ctx = multiprocessing.get_context("spawn")
+    ready, stop = ctx.Queue(), ctx.Event()
+    process = ctx.Process(target=gateway_process, args=(kind, options, ready, stop), daemon=True)
+    process.start()
+    try:
+        port = ready.get(timeout=30)
+        result = asyncio.run(run_scenario(port, psutil.Process(process.pid), args))
+    finally:
+        stop.set()
+        process.join(10)
+        if process.is_alive():
+            process.terminate()
+    return result
+
+
+def version():
+    try:
+        return subprocess.check_output(["git", "describe", "--always", "--dirty"], text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def compare(old, new):
+    """İki sonuç dosyasındaki ana metriklerin yüzde değişimini yazdırır."""
+    metrics = [
+        ("connect_ms", "p50"), ("connect_ms", "p99"),
+        ("throughput_mb_s", None), ("cpu_ms_per_mb", None),
+        ("memory_per_connection_kb", None), ("rtt_ms", "p99"),
+    ]
+    for name, current in new["scenarios"].items():
+        previous = old["scenarios"].get(name)
+        if not previous:
+            continue
+        for metric, sub in metrics:
+            a, b = previous.get(metric), current.get(metric)
+            if sub:
+                a, b = (a or {}).get(sub), (b or {}).get(sub)
+            if not a or b is None:
+                continue
+            label = f"{metric}.{sub}" if sub else metric
+            print(f"[{name}] {label}: {a} -> {b} ({(b - a) / a * 100:+.1f}%)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clients", type=int, default=50)
+    parser.add_argument("--mb", type=float, default=2, help="istemci başına aktarılacak MB")
+    parser.add_argument("--pings", type=int, default=200)
+    parser.add_argument("--ping-clients", type=int, default=10)
+    parser.add_argument("--scenarios", nargs="+", default=list(SCENARIOS), choices=list(SCENARIOS))
+    parser.add_argument("--output", default="gateway_bench.json")
+    parser.add_argument("--compare", help="önceki bir sonuç dosyası")
+    args = parser.parse_args()
+
+    report = {
+        "version": version(),
+        "timestamp": time.time(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "args": {k: v for k, v in vars(args).items() if k not in ("output", "compare")},
+        "scenarios": {},
+    }
+    for name in args.scenarios:
+        result = run(name, args)
+        report["scenarios"][name] = result
+        print(f"[{name}] bağlı {result['connected']}/{result['clients']} | "
+              f"connect p50 {result['connect_ms'].get('p50')} ms p99 {result['connect_ms'].get('p99')} ms | "
+              f"{result['throughput_mb_s']} MB/s, CPU {result['cpu_ms_per_mb']} ms/MB | "
+              f"{result['memory_per_connection_kb']} KB/bağlantı | RTT p99 {result['rtt_ms'].get('p99')} ms | "
+              f"hatalar {result['errors']}")
+
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=4)
+    print(f"Sonuçlar kaydedildi: {args.output}")
+    if args.compare:
+        with open(args.compare) as f:
+            compare(json.load(f), report)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""HealthChecker süreç/bağlantı taraması benchmark'ı.
+
+--processes adet boşta bekleyen süreç başlatır ve istemci bağlantısını bulma
+maliyetini karşılaştırır:
+
+  - eski yöntem: her tikte psutil.process_iter ile tüm süreçlerin adı,
+    ardından psutil.net_connections ile makinedeki tüm TCP soketleri
+  - ClientProcesses: PID farkı + yalnızca istemci süreçlerinin bağlantıları
+    (önbelleksiz, yani her tikte yeniden sorgulanarak)
+  - ClientProcesses, TTL içinde önbellekten
+
+İstemci olarak bu işlem kullanılır (--client-name verilmezse kendi adı);
+makinenin yerel dışı bir IP'si varsa oraya açılan bir TCP bağlantısı
+"oyun bağlantısı" olarak bulunmalıdır.
+
+Kullanım:
+    python -m benchmarks.health_scan [--processes 500] [--repeat 20]
+"""
+import argparse
+import shutil
+import socket
+import subprocess
+import sys
+import time
+
+import psutil
+
+from benchmarks.gateway_suite import percentiles
+from core import processes
+
+
+def legacy_connection(process_name, ignore_ports):
+    valid_pids = {
+        p.info["pid"]
+        for p in psutil.process_iter(attrs=["pid", "name"])
+        if process_name in (p.info["name"] or "").lower()
+    }
+    if not valid_pids:
+        return processes.NO_CONNECTION
+    for conn in psutil.net_connections(kind="tcp"):
+        if conn.status == psutil.CONN_ESTABLISHED and conn.pid in valid_pids:
+            laddr, raddr = conn.laddr, conn.raddr
+            if laddr and raddr and raddr.port not in ignore_ports and laddr.port not in ignore_ports:
+                if raddr.ip == "127.0.0.1":
+                    continue
+                return laddr.ip, laddr.port, raddr.ip, raddr.port
+    return processes.NO_CONNECTION
+
+
+def spawn_idle(count):
+    sleep = shutil.which("sleep")
+    command = [sleep, "600"] if sleep else [sys.executable, "-c", "import time; time.sleep(600)"]
+    return [subprocess.Popen(command, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL) for _ in range(count)]
+
+
+PEER = """
+import socket, sys, time
+server = socket.create_server((sys.argv[1], 0))
+print(server.getsockname()[1], flush=True)
+conn, _ = server.accept()
+time.sleep(600)
+"""
+
+
+def open_game_connection():
+    """Yerel dışı bir IP'de dinleyen alt sürece bağlanır; böyle bir IP yoksa None."""
+    for addrs in psutil.net_if_addrs().values():
+        for addr in addrs:
+            if addr.family == socket.AF_INET and not addr.address.startswith("127."):
+                peer = subprocess.Popen([sys.executable, "-c", PEER, addr.address], stdout=subprocess.PIPE, text=True)
+                port = int(peer.stdout.readline())
+                return peer, socket.create_connection((addr.address, port))
+    return None
+
+
+def timed(func, repeat):
+    samples, result = [], None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        samples.append((time.perf_counter() - start) * 1000)
+    return percentiles(samples), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--processes", type=int, default=500)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--client-name", default=None)
+    args = parser.parse_args()
+
+    name = (args.client_name or psutil.Process().name()).lower()
+    ignore = {13304, 13310}
+    idle = spawn_idle(args.processes)
+    game = open_game_connection()
+    try:
+        tracker = processes.ClientProcesses(name, ignore)
+        tracker.refresh()
+        print(f"{len(psutil.pids())} süreç, istemci adı '{name}', izlenen {len(tracker.clients)} süreç")
+
+        legacy_ms, legacy = timed(lambda: legacy_connection(name, ignore), args.repeat)
+        uncached_ms, found = timed(lambda: tracker.active_connection(ttl=0), args.repeat)
+        cached_ms, _ = timed(lambda: tracker.active_connection(), args.repeat)
+        # Karşı uç da aynı adlı bir süreç olduğundan bağlantı iki uçtan birinden görülebilir.
+        if sorted([legacy[:2], legacy[2:]], key=str) != sorted([found[:2], found[2:]], key=str):
+            raise AssertionError(f"sonuçlar farklı: {legacy} != {found}")
+
+        print(f"bulunan bağlantı: {found}")
+        print(f"  eski tarama           p50 {legacy_ms.get('p50'):9.3f} ms  p99 {legacy_ms.get('p99'):9.3f} ms")
+        print(f"  ClientProcesses       p50 {uncached_ms.get('p50'):9.3f} ms  p99 {uncached_ms.get('p99'):9.3f} ms")
+        print(f"  ClientProcesses (TTL) p50 {cached_ms.get('p50'):9.3f} ms  p99 {cached_ms.get('p99'):9.3f} ms")
+        print(f"  ad incelenen süreç: {tracker.inspected}, bağlantı sorgusu: {tracker.queries}")
+    finally:
+        for proc in idle:
+            proc.kill()
+        for proc in idle:
+            proc.wait()
+        if game:
+            game[1].close()
+            game[0].kill()
+            game[0].wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,176 @@
+"""HUB istemcisi yük testi.
+
+Sahte HUB (benchmarks.mock_hub) ayrı bir işlemde N sunuculu sentetik ağla
+çalışır; bu işlemde --clients adet başsız HUB istemcisi bağlanır. Her ağ
+boyutu için ölçülenler:
+
+  - ilk listenin yüklenme süresi (bağlantıdan registry dolana kadar) ve
+    liste çerçevesinin registry'ye uygulanma süresi (çözme thread'de yapılır)
+  - güncelleme başına çözme süresi ve CPU
+  - istemci başına bellek
+  - güncelleme gecikmesi: HUB'ın server_patch'i gönderdiği an ile registry
+    abonesinin (GUI'nin değişiklik kuyruğu) çağrıldığı an arasındaki süre
+
+Kullanım:
+    python -m benchmarks.hub_load [--servers 10000 100000] [--clients 20] [--rate 50]
+"""
+import argparse
+import asyncio
+import json
+import multiprocessing
+import platform
+import time
+
+import psutil
+
+from benchmarks.gateway_suite import percentiles, version
+from benchmarks.mock_hub import MockHub
+from core import console, registry
+from core.ClientHub import HUB
+
+LOAD_TIMEOUT = 120
+
+
+def hub_process(servers, rate, json_only, ready, stop):
+    async def main():
+        hub = MockHub(servers, rate, codecs=not json_only)
+        ready.put(await hub.start())
+        while not stop.is_set():
+            await asyncio.sleep(0.2)
+        ready.put(hub.stats())
+        await hub.stop()
+
+    asyncio.run(main())
+
+
+class HeadlessClient:
+    """GUI'siz HUB istemcisi; mesaj çözme sürelerini ve güncelleme gecikmesini kaydeder."""
+
+    def __init__(self, port):
+        self.hub = HUB("127.0.0.1", port)
+        self.hub.public_ip = "127.0.0.1"
+        self.parse = []
+        self.latencies = []
+        self.listener = None
+        self.heartbeat = None
+        self.loaded_at = None
+        self.handle_message = self.hub.handle_message
+        self.hub.handle_message = self.timed_handle
+        self.hub.registry.subscribe(self.on_change)
+
+    def timed_handle(self, frame, decoded=None):
+        start = time.perf_counter()
+        self.handle_message(frame, decoded)
+        self.parse.append(((time.perf_counter() - start) * 1000, len(frame)))
+
+    def on_change(self, event, server_id, server):
+        if event == registry.PATCH and "updated" in server:
+            self.latencies.append((time.time() - server["updated"]) * 1000)
+
+    async def connect(self, expected):
+        start = time.perf_counter()
+        await self.hub.start()
+        self.listener = asyncio.create_task(self.hub.listen_servers_broadcast())
+        self.heartbeat = asyncio.create_task(self.hub.heartbeat())
+        while len(self.hub.registry) < expected:
+            await asyncio.sleep(0.01)
+        self.loaded_at = time.perf_counter() - start
+
+    async def close(self):
+        for task in (self.listener, self.heartbeat):
+            if task:
+                task.cancel()
+        await asyncio.gather(*(t for t in (self.listener, self.heartbeat) if t), return_exceptions=True)
+        await self.hub.close()
+
+
+async def run_size(port, servers, args):
+    proc = psutil.Process()
+    rss_before = proc.memory_info().rss
+    clients = [HeadlessClient(port) for _ in range(args.clients)]
+    # Yükleme süreleri birbirini etkilemesin diye istemciler sırayla bağlanır.
+    for client in clients:
+        await asyncio.wait_for(client.connect(servers), LOAD_TIMEOUT)
+    rss_after = proc.memory_info().rss
+
+    first_frames = [max(c.parse, key=lambda p: p[1]) for c in clients if c.parse]
+    for client in clients:
+        client.parse.clear()
+        client.latencies.clear()
+
+    cpu_before = sum(proc.cpu_times()[:2])
+    await asyncio.sleep(args.duration)
+    cpu = sum(proc.cpu_times()[:2]) - cpu_before
+
+    updates = sum(len(c.parse) for c in clients)
+    result = {
+        "clients": args.clients,
+        "codec": clients[0].hub.codec.name,
+        "load_s": percentiles([c.loaded_at for c in clients]),
+        "list_frame_bytes": first_frames[0][1] if first_frames else None,
+        "list_apply_ms": percentiles([p[0] for p in first_frames]),
+        "memory_per_client_mb": round((rss_after - rss_before) / args.clients / 1048576, 2),
+        "updates_received": updates,
+        "update_parse_us": percentiles([p[0] * 1000 for c in clients for p in c.parse]),
+        "cpu_us_per_update": round(cpu * 1e6 / updates, 2) if updates else None,
+        "update_latency_ms": percentiles([l for c in clients for l in c.latencies]),
+    }
+    await asyncio.gather(*(c.close() for c in clients))
+    return result
+
+
+def run(servers, args):
+    ctx = multiprocessing.get_context("spawn")
+    ready, stop = ctx.Queue(), ctx.Event()
+    process = ctx.Process(target=hub_process, args=(servers, args.rate, args.json_only, ready, stop), daemon=True)
+    process.start()
+    try:
+        port = ready.get(timeout=LOAD_TIMEOUT)
+        result = asyncio.run(run_size(port, servers, args))
+        stop.set()
+        result["hub"] = ready.get(timeout=30)
+    finally:
+        stop.set()
+        process.join(10)
+        if process.is_alive():
+            process.terminate()
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--servers", type=int, nargs="+", default=[10000])
+    parser.add_argument("--clients", type=int, default=20)
+    parser.add_argument("--rate", type=float, default=50, help="saniyedeki sunucu güncellemesi")
+    parser.add_argument("--duration", type=float, default=10, help="sürekli güncelleme ölçüm süresi (sn)")
+    parser.add_argument("--json-only", action="store_true", help="sahte HUB codec müzakeresine yanıt vermez")
+    parser.add_argument("--verbose", action="store_true", help="istemcilerin DEBUG loglarını da yaz")
+    parser.add_argument("--output", default="hub_bench.json")
+    args = parser.parse_args()
+    # Ölçümü log çıktısı etkilemesin; varsayılan olarak yalnızca uyarılar yazılır.
+    console.set_level(None, "DEBUG" if args.verbose else "WARNING")
+
+    report = {
+        "version": version(),
+        "timestamp": time.time(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "args": {k: v for k, v in vars(args).items() if k not in ("output", "verbose")},
+        "sizes": {},
+    }
+    for servers in args.servers:
+        result = run(servers, args)
+        report["sizes"][servers] = result
+        print(f"[{servers} sunucu] {result['codec']} | yükleme p50 {result['load_s'].get('p50')} sn | "
+              f"liste {result['list_frame_bytes']} byte, uygulama p50 {result['list_apply_ms'].get('p50')} ms | "
+              f"{result['memory_per_client_mb']} MB/istemci | güncelleme p99 {result['update_parse_us'].get('p99')} us, "
+              f"CPU {result['cpu_us_per_update']} us | gecikme p50 {result['update_latency_ms'].get('p50')} ms "
+              f"p99 {result['update_latency_ms'].get('p99')} ms")
+
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=4)
+    print(f"Sonuçlar kaydedildi: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
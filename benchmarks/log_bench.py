@@ -0,0 +1,80 @@
+"""Log hattı benchmark'ı.
+
+Eski HUB.console_log yolunu (print + logging.info ile dosyaya yazma + GUI
+callback, hepsi çağıran thread'de) core.console ile karşılaştırır:
+
+  - kapalı seviyede debug çağrısı (sıcak yollarda varsayılan durum)
+  - açık seviyede info çağrısı (yalnızca kuyruğa ekleme)
+  - kuyruğun yazıcı thread'inde boşaltılma süresi
+
+Kullanım:
+    python -m benchmarks.log_bench [--count 5000]
+"""
+import argparse
+import io
+import logging
+import os
+import sys
+import tempfile
+import time
+
+from core import console
+
+
+def old_console_log(count, path):
+    logger = logging.getLogger("log_bench.old")
+    logger.propagate = False
+    logger.setLevel(logging.INFO)
+    handler = logging.FileHandler(path)
+    handler.setFormatter(logging.Formatter("%(asctime)s [%(levelname)s] %(message)s"))
+    logger.addHandler(handler)
+    stdout, sys.stdout = sys.stdout, io.StringIO()
+    gui = []
+    package = {"id": "3f2b8c1e", "data": {"type": "Heartbeat", "ack": 1234}, "timestamp": time.time()}
+    try:
+        start = time.perf_counter()
+        for i in range(count):
+            message = f"[INFO] Veri gönderildi: {package['data'].get('type')} ({i} byte)"
+            print(message, flush=True)
+            logger.info(message)
+            gui.append(f"{message}\n")
+        return (time.perf_counter() - start) / count * 1e6
+    finally:
+        sys.stdout = stdout
+        logger.removeHandler(handler)
+        handler.close()
+
+
+def new_calls(count, level):
+    log = console.get("bench")
+    console.set_level("bench", level)
+    start = time.perf_counter()
+    for i in range(count):
+        log.debug("Veri gönderildi: %s (%d byte)", "Heartbeat", i)
+    return (time.perf_counter() - start) / count * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--count", type=int, default=5000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        old_us = old_console_log(args.count, os.path.join(tmp, "old.log"))
+        pipeline = console.setup(os.path.join(tmp, "new.log"))
+        pipeline.stream = io.StringIO()
+        disabled_us = new_calls(args.count, "INFO")
+        enabled_us = new_calls(args.count, "DEBUG")
+        start = time.perf_counter()
+        console.flush(timeout=60)
+        drain_ms = (time.perf_counter() - start) * 1000
+        pipeline.stop()
+
+    print(f"eski console_log          {old_us:8.2f} us/çağrı")
+    print(f"console, seviye kapalı    {disabled_us:8.2f} us/çağrı")
+    print(f"console, seviye açık      {enabled_us:8.2f} us/çağrı (kuyruk boşaltma {drain_ms:.1f} ms)")
+    print(f"console istatistikleri    {console.stats()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,241 @@
+"""Yerel sahte HUB sunucusu.
+
+Gerçek HUB protokolünü uygular: bağlantıda kimlik gönderir, Client paketini
+okur (codec seçimi, özet liste alanları, resume), tam sunucu listesini yollar
+ve sentetik ağdaki sunucuları saniyede --rate kez server_patch ile günceller.
+info/join/Heartbeat mesajlarını sayar, cid'li server_detail isteklerini
+yanıtlar.
+
+GUI'yi buna bağlamak için .env'de local = 1, HUB_IP = 127.0.0.1 ve HUB_Port
+değerini --port ile aynı yapın.
+
+Kullanım:
+    python -m benchmarks.mock_hub [--servers 10000] [--rate 50] [--port 13310]
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+import uuid
+from collections import deque
+
+from benchmarks.codec_bench import make_servers
+from core import codec, details
+from core.framing import LineDecoder, LengthPrefixedDecoder
+from utils.helper import create_message
+
+# Resume için saklanan en fazla delta sayısı; daha eski seq'ler tam liste alır.
+CHANGELOG_SIZE = 10000
+HUB_ID = "mock-hub"
+
+
+class MockClient:
+    def __init__(self, writer, identifier):
+        self.writer = writer
+        self.identifier = identifier
+        self.codec = codec.JsonCodec()
+        self.fields = None
+        self.ack = 0
+
+
+class MockHub:
+    """Sentetik N sunuculu ağı yöneten ve bağlı istemcilere yayınlayan sahte HUB."""
+
+    def __init__(self, servers=10000, rate=50.0, seed=3131, codecs=True, resume=True):
+        self.rng = random.Random(seed)
+        self.servers = {server["ID"]: server for server in make_servers(servers, self.rng)}
+        self.rate = rate
+        self.codecs = codecs
+        self.resume = resume
+        self.seq = 0
+        self.versions = dict.fromkeys(self.servers, 1)
+        self.changelog = deque(maxlen=CHANGELOG_SIZE)
+        self.sessions = {}
+        self.clients = set()
+        self.list_cache = {}
+        self.counts = {}
+        self.server = None
+        self.task = None
+
+    def count(self, msg_type):
+        self.counts[msg_type] = self.counts.get(msg_type, 0) + 1
+
+    async def full_list(self, client):
+        """Tam listeyi istemcinin codec'i ve alanlarıyla kodlar, (çerçeve, seq) döndürür.
+
+        Büyük ağlarda kodlama saniyeler sürebilir; diğer istemcilerin codec
+        yanıtı gecikmesin diye kopyalanan liste thread'de kodlanır ve aynı seq
+        için önbelleklenir.
+        """
+        seq = self.seq
+        key = (client.codec.name, tuple(client.fields or ()), seq)
+        frame = self.list_cache.get(key)
+        if frame is None:
+            fields = set(client.fields or ())
+            servers = [
+                {k: v for k, v in server.items() if k in fields} if fields else dict(server)
+                for server in self.servers.values()
+            ]
+            message = create_message(HUB_ID, "request", {
+                "value": "servers", "data": servers, "full": True, "seq": seq,
+            })
+            frame = await asyncio.to_thread(client.codec.frame, message)
+            self.list_cache = {key: frame}
+        return frame, seq
+
+    def catch_up(self, client, since):
+        for seq, message in self.changelog:
+            if seq > since:
+                client.writer.write(client.codec.frame(message))
+
+    async def handshake(self, reader, writer):
+        identifier = str(uuid.uuid4())
+        writer.write(identifier.encode())
+        await writer.drain()
+        line = await reader.readline()
+        data = json.loads(line)["data"]
+        self.count(data.get("type"))
+        client = MockClient(writer, identifier)
+        client.fields = data.get("list_fields")
+        offered = data.get("codecs") or []
+        if self.codecs and offered:
+            supported = codec.available()
+            name = next((name for name in offered if name in supported), "json")
+            writer.write(json.dumps(create_message(HUB_ID, "codec", {"value": name})).encode() + b"\n")
+            client.codec = supported[name]
+        token = data.get("resume")
+        if self.resume and token and token.get("id") in self.sessions:
+            since = token.get("seq", 0)
+            if since == self.seq or (self.changelog and self.changelog[0][0] <= since + 1):
+                client.identifier = token["id"]
+                writer.write(client.codec.frame(create_message(HUB_ID, "resume", {"value": "ok", "id": token["id"]})))
+                self.catch_up(client, since)
+                return client
+            writer.write(client.codec.frame(create_message(HUB_ID, "resume", {"value": "full"})))
+        frame, seq = await self.full_list(client)
+        writer.write(frame)
+        # Liste kodlanırken yayınlanan güncellemeler.
+        self.catch_up(client, seq)
+        return client
+
+    async def handle(self, reader, writer):
+        try:
+            client = await self.handshake(reader, writer)
+        except (ConnectionError, ValueError, KeyError, TypeError):
+            writer.close()
+            return
+        self.sessions[client.identifier] = time.time()
+        self.clients.add(client)
+        decoder = LengthPrefixedDecoder() if client.codec.framing == "length" else LineDecoder()
+        try:
+            while data := await reader.read(64 * 1024):
+                for frame in decoder.feed(data):
+                    await self.on_message(client, client.codec.decode(frame))
+        except (ConnectionError, ValueError):
+            pass
+        finally:
+            self.clients.discard(client)
+            writer.close()
+
+    async def on_message(self, client, message):
+        data = message.get("data", {})
+        msg_type = data.get("type")
+        self.count(msg_type)
+        if msg_type == "Heartbeat":
+            client.ack = data.get("ack") or client.ack
+        cid = message.get("cid")
+        if cid is None:
+            return
+        if msg_type == "request" and data.get("value") == "server_detail":
+            server = self.servers.get(data.get("target"))
+            if server is None:
+                reply = {"type": "error", "value": "unknown server"}
+            else:
+                fields = data.get("fields") or details.DETAIL_FIELDS
+                reply = {"type": "response", "value": "server_detail",
+                         "data": {k: server[k] for k in fields if k in server}}
+        else:
+            reply = {"type": "error", "value": f"unsupported request {msg_type}"}
+        response = {"id": HUB_ID, "cid": cid, "timestamp": time.time(), "data": reply}
+        client.writer.write(client.codec.frame(response))
+        await client.writer.drain()
+
+    def mutate(self):
+        server_id = self.rng.randint(1, len(self.servers))
+        server = self.servers[server_id]
+        fields = {
+            "players": self.rng.randint(0, server["max_players"]),
+            "ping": self.rng.randint(20, 200),
+            # Yük testi GUI gecikmesini bu zaman damgasından ölçer.
+            "updated": time.time(),
+        }
+        server.update(fields)
+        self.seq += 1
+        self.versions[server_id] += 1
+        message = create_message(HUB_ID, "server_patch", {
+            "target": server_id, "data": fields, "version": self.versions[server_id], "seq": self.seq,
+        })
+        self.changelog.append((self.seq, message))
+        return message
+
+    async def broadcast_loop(self):
+        if self.rate <= 0:
+            return
+        interval = 1 / self.rate
+        # Yüksek hızlarda her uyanışta birden fazla güncelleme gönderilir.
+        batch = max(1, int(self.rate / 100))
+        next_at = time.perf_counter()
+        while True:
+            messages = [self.mutate() for _ in range(batch)]
+            frames = {}
+            for client in list(self.clients):
+                name = client.codec.name
+                if name not in frames:
+                    frames[name] = b"".join(client.codec.frame(message) for message in messages)
+                client.writer.write(frames[name])
+            next_at += interval * batch
+            await asyncio.sleep(max(0.0, next_at - time.perf_counter()))
+
+    async def start(self, host="127.0.0.1", port=0):
+        self.server = await asyncio.start_server(self.handle, host, port)
+        self.task = asyncio.create_task(self.broadcast_loop())
+        return self.server.sockets[0].getsockname()[1]
+
+    async def stop(self):
+        if self.task:
+            self.task.cancel()
+            await asyncio.gather(self.task, return_exceptions=True)
+        if self.server:
+            self.server.close()
+            await self.server.wait_closed()
+
+    def stats(self):
+        return {"clients": len(self.clients), "seq": self.seq, "messages": dict(self.counts)}
+
+
+async def serve(args):
+    hub = MockHub(args.servers, args.rate, codecs=not args.json_only)
+    port = await hub.start(args.host, args.port)
+    print(f"[MOCK] {len(hub.servers)} sunucu, saniyede {args.rate} güncelleme, {args.host}:{port}")
+    while True:
+        await asyncio.sleep(10)
+        print(f"[MOCK] {hub.stats()}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--servers", type=int, default=10000)
+    parser.add_argument("--rate", type=float, default=50, help="saniyedeki sunucu güncellemesi")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=13310)
+    parser.add_argument("--json-only", action="store_true", help="codec müzakeresine yanıt verme")
+    args = parser.parse_args()
+    try:
+        asyncio.run(serve(args))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""Gateway benchmark'ları için yerel sahte upstream gateway sunucuları.
+
+Her sunucu bağlantı açılır açılmaz gerçek Silkroad gateway'i gibi küçük bir
+karşılama paketi (0x5000) gönderir, sonra gelen veriyi geri yollar.
+"""
+import asyncio
+import random
+import struct
+
+HELLO = struct.pack("<HHBB", 8, 0x5000, 0, 0) + bytes(8)
+READ_SIZE = 64 * 1024
+
+
+async def echo_loop(reader, writer, delay=0.0, reset_chance=0.0):
+    try:
+        writer.write(HELLO)
+        while data := await reader.read(READ_SIZE):
+            if reset_chance and random.random() < reset_chance:
+                writer.transport.abort()
+                return
+            if delay:
+                await asyncio.sleep(delay)
+            writer.write(data)
+            await writer.drain()
+    except ConnectionError:
+        pass
+    finally:
+        writer.close()
+
+
+def echo():
+    return echo_loop
+
+
+def delayed(delay_ms=20):
+    """Her parçayı geri yollamadan önce delay_ms bekler (uzak sunucu RTT'si)."""
+    async def handler(reader, writer):
+        await echo_loop(reader, writer, delay=delay_ms / 1000)
+    return handler
+
+
+def lossy(reset_chance=0.001):
+    """Her parçada reset_chance olasılıkla bağlantıyı RST ile düşürür."""
+    async def handler(reader, writer):
+        await echo_loop(reader, writer, reset_chance=reset_chance)
+    return handler
+
+
+def flaky_accept(drop_chance=0.3, accept_delay_ms=300):
+    """Bağlantıların bir kısmını hemen kapatır, kalanları geç kabul eder."""
+    async def handler(reader, writer):
+        if random.random() < drop_chance:
+            writer.transport.abort()
+            return
+        await asyncio.sleep(random.uniform(0, accept_delay_ms / 1000))
+        await echo_loop(reader, writer)
+    return handler
+
+
+KINDS = {
+    "echo": echo,
+    "delayed": delayed,
+    "lossy": lossy,
+    "flaky": flaky_accept,
+}
+
+
+async def start(kind="echo", host="127.0.0.1", port=0, **options):
+    """Verilen türde sahte upstream başlatır, (server, port) döndürür."""
+    server = await asyncio.start_server(KINDS[kind](**options), host, port)
+    return server, server.sockets[0].getsockname()[1]
@@ -1,45 +1,67 @@
-import asyncio, itertools, os, dotenv, socket, aiohttp, json, time
-import threading,random,ping3,hashlib
-import traceback
-import logging
-
-
-# Loglama ayarları
-logging.basicConfig(
-    filename='hub.log',
-    level=logging.INFO,
-    format='%(asctime)s [%(levelname)s] %(message)s'
-)
+import asyncio, os, sys, dotenv, socket, aiohttp, json, time, statistics
+import threading,random,hashlib,itertools
 
 if __name__ != "__main__":
-    from utils.helper import check_ping, create_message
+    from utils.helper import create_message
     from core.HealthChecker import HealthChecker
+    from core import codec, console, details, framing, metrics, outbox, prober, registry, relay, resolver, rtt, runtime, silkroad, upstream, workers
+else:
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from core import console, metrics, relay, resolver, rtt, silkroad, upstream
+
+log = console.get("hub")
+relay_log = console.get("relay")
 
 random.seed(3131)
 
 dotenv.load_dotenv()
 
+# HUB'a yeniden bağlanma beklemesi (saniye); her başarısız denemede ikiye katlanır,
+# gerçek bekleme [0, süre] aralığında rastgeledir.
+RECONNECT_MIN = float(os.getenv("HUB_Reconnect_Min") or 1)
+RECONNECT_MAX = float(os.getenv("HUB_Reconnect_Max") or 60)
+HUB_CONNECT_TIMEOUT = 5
+HEARTBEAT_INTERVAL = float(os.getenv("HUB_Heartbeat") or 10)
+# Bu kadar süre HUB'dan hiç veri gelmezse bağlantı ölü sayılır; 0 ise kapalı.
+# Yalnızca heartbeat'lere yanıt veren HUB'larla açılmalıdır.
+DEAD_AFTER = float(os.getenv("HUB_Dead_After") or 0)
+# HUB.request için varsayılan yanıt bekleme süresi (saniye).
+REQUEST_TIMEOUT = float(os.getenv("HUB_Request_Timeout") or 10)
+# Bu boyuttan büyük çerçeveler (tam sunucu listesi) thread'de çözülür; aksi halde
+# çözme süresince aynı loop'taki gateway'ler ve heartbeat durur.
+DECODE_IN_THREAD = 256 * 1024
+
 class Gateway:
-    def __init__(self, ip_list: list, gw_port: int, _hub):
+    def __init__(self, ip_list: list, gw_port: int, _hub, local_port: int = None, reuse_port: bool = False):
         self.ip_list = ip_list
         self.target_port = gw_port
-        self.server_cycle = itertools.cycle(ip_list)
+        self.resolver = resolver.ResolverCache()
+        self.selector = upstream.UpstreamSelector(ip_list, gw_port, self.resolver)
+        self.pool = upstream.UpstreamPool(self.selector) if upstream.POOL_SIZE > 0 else None
         self.localIP = self.getLocalIP()
         self.lock = threading.Lock()
         self.GW_IP = os.getenv("Gateway_IP")
-        self._Port = int(os.getenv("Gateway_Port"))
+        self._Port = int(os.getenv("Gateway_Port")) if local_port is None else local_port
         self.HUB = _hub
         self.public_ip = None
-        self.connection_counter = 0
+        self.server = None
+        self.bound_port = None
+        self.sessions = set()
+        self.reuse_port = reuse_port
+        self.metrics = metrics.GatewayMetrics()
+        self.buffer_size = relay.BUFFER_SIZE
+        self.packet_log = int(os.getenv("Packet_Log", 0)) == 1
+        self.packet_framing = int(os.getenv("Packet_Framing", 0)) == 1
+        self.packet_stats = {"up": silkroad.PacketStats(), "down": silkroad.PacketStats()}
 
     async def fetch_ip(self):
         try:
             async with aiohttp.ClientSession() as session:
                 async with session.get('https://api.ipify.org') as response:
                     self.public_ip = await response.text()
-                    print(f"[INFO] Public IP alınan: {self.public_ip}")
+                    log.info("Public IP alınan: %s", self.public_ip)
         except Exception as e:
-            print(f"[fetch_ip] IP alınamadı: {e}")
+            log.warning("Public IP alınamadı: %s", e)
             self.public_ip = "0.0.0.0"
 
     def getLocalIP(self):
@@ -49,147 +71,435 @@ class Gateway:
         s.close()
         return ip
 
-    async def forward(self, reader, writer):
-        #peer_ip = writer.get_extra_info('peername')[0]
-        while data := await reader.read(32):
-            hex_data = data.hex()
-            #print(peer_ip, hex_data)
-            writer.write(data)
-            await writer.drain()
+    async def forward(self, reader, writer, direction="up", counter=None, tracker=None):
+        """reader'dan gelen veriyi writer'a aktarır, aktarılan byte sayısını döndürür.
+
+        tracker (rtt.RttTracker) zamanlama gerektiriyorsa yukarı yönde sent(),
+        aşağı yönde received() her parçada çağrılır; gerekmiyorsa ve paket logu
+        kapalıysa parça başına hiçbir iş yapılmaz.
+        """
+        relay.tune_writer(writer)
+        timing = None
+        if tracker is not None and tracker.timed:
+            timing = tracker.sent if direction == "up" else tracker.received
+        if self.packet_framing:
+            on_packet = timing
+            if self.packet_log:
+                peer_ip = writer.get_extra_info('peername')[0]
+                def on_packet(opcode, packet):
+                    relay_log.info("%s %04X %s", peer_ip, opcode, packet.hex())
+                    if timing:
+                        timing()
+            return await silkroad.frame_pump(reader, writer, self.packet_stats[direction],
+                                             self.buffer_size, on_packet=on_packet, counter=counter)
+        if not self.packet_log:
+            return await relay.pump(reader, writer, self.buffer_size, on_chunk=timing, counter=counter)
+        peer_ip = writer.get_extra_info('peername')[0]
+        def on_chunk(data):
+            relay_log.info("%s %s", peer_ip, data.hex())
+            if timing:
+                timing()
+        return await relay.pump(reader, writer, self.buffer_size, on_chunk=on_chunk, counter=counter)
+
+    def rtt_sample(self):
+        """Açık oturumların pasif gecikme ölçümlerinin medyanı (ms); ölçüm yoksa None."""
+        samples = [s.rtt.sample() for s in list(self.metrics.active.values()) if s.rtt]
+        samples = [sample for sample in samples if sample is not None]
+        return statistics.median(samples) if samples else None
+
+    def opcode_report(self, n=10):
+        """Framing açıkken yön başına en çok bant genişliği harcayan opcode'lar."""
+        return {direction: stats.top(n) for direction, stats in self.packet_stats.items()}
+
+    @property
+    def connection_counter(self):
+        return len(self.metrics.active)
+
+    def stats(self):
+        """Gateway sayaçlarının anlık görüntüsü (yalnızca toplanabilir sayılar)."""
+        data = self.metrics.totals()
+        data["pool_hits"] = self.pool.hits if self.pool else 0
+        data["pool_misses"] = self.pool.misses if self.pool else 0
+        return data
+
+    def snapshot(self):
+        """Oturum listeleri ve upstream skorlarıyla birlikte ayrıntılı görüntü."""
+        data = self.metrics.snapshot()
+        data["local_port"] = self.local_port
+        data["target_port"] = self.target_port
+        data["pool_hits"] = self.pool.hits if self.pool else 0
+        data["pool_misses"] = self.pool.misses if self.pool else 0
+        data["upstreams"] = {
+            addr: {"latency_ms": st.latency, "fail_rate": round(st.fail_rate, 3),
+                   "successes": st.successes, "failures": st.failures}
+            for addr, st in list(self.selector.stats.items())
+        }
+        if self.packet_framing:
+            data["opcodes"] = self.opcode_report()
+        return data
 
     async def close_connection(self, writer):
         try:
             writer.close()
             await writer.wait_closed()
-            print(writer.get_extra_info("peername"),f"Closed counter {self.connection_counter}")
+            relay_log.debug("%s kapandı, açık oturum %d", writer.get_extra_info("peername"), self.connection_counter)
         except:
             pass
 
     async def handle_client(self, reader, writer):
-        _reader = _writer = None
-        self.connection_counter += 1
-        for attempt in range(25):
-            host = next(self.server_cycle)
-            port = self.target_port
-            try:
-                _reader, _writer = await asyncio.wait_for(
-                    asyncio.open_connection(host, port),
-                    timeout=2.0
-                )
-                print(f"[FORWARD] Bağlandı: {host}:{port}")
-                break
-            except:
-                print(f"[FORWARD] Attempt {attempt+1} başarısız: {host}:{port}")
+        task = asyncio.current_task()
+        self.sessions.add(task)
+        try:
+            await self.relay_session(reader, writer)
+        except asyncio.CancelledError:
+            # stop() oturumu iptal eder; iptal yeniden yükseltilirse asyncio'nun
+            # StreamReaderProtocol geri çağrısı her oturum için hata loglar.
+            writer.transport.abort()
+        finally:
+            self.sessions.discard(task)
 
-        if not _reader:
-            print("[FORWARD] Uygun sunucu bulunamadı.")
-            return
+    async def relay_session(self, reader, writer):
+        peer = writer.get_extra_info('peername')
+        session = self.metrics.open(f"{peer[0]}:{peer[1]}" if peer else None)
+        error = None
         try:
-            await asyncio.gather(
-                self.forward(reader, _writer),
-                self.forward(_reader, writer)
-            )
-        except:
+            start = time.perf_counter()
+            picked = self.pool.acquire() if self.pool else None
+            if not picked:
+                picked = await self.selector.connect()
+            if not picked:
+                relay_log.warning("Uygun sunucu bulunamadı.")
+                error = "no upstream"
+                return
+            host, _reader, _writer = picked
+            self.metrics.upstream_connected(session, host, (time.perf_counter() - start) * 1000)
+            relay_log.debug("Bağlandı: %s:%s", host, self.target_port)
+            session.rtt = rtt.RttTracker(_writer.get_extra_info("socket"))
+            try:
+                await asyncio.gather(
+                    self.forward(reader, _writer, "up", session.up, session.rtt),
+                    self.forward(_reader, writer, "down", session.down, session.rtt)
+                )
+            except Exception as e:
+                error = type(e).__name__
+            finally:
+                await self.close_connection(_writer)
+        finally:
+            self.metrics.close(session, error)
             await self.close_connection(writer)
-            await self.close_connection(_writer)
-        self.connection_counter -= 1
 
-    async def serve(self):
-        self.server = await asyncio.start_server(self.handle_client, self.GW_IP, self._Port)
+    @property
+    def local_port(self):
+        return self.bound_port or self._Port
+
+    async def listen(self):
+        """Yerel portu dinlemeye başlar ve hemen döner."""
+        self.server = await asyncio.start_server(self.handle_client, self.GW_IP, self._Port,
+                                                 reuse_port=self.reuse_port or None)
+        self.resolver.start(self.ip_list)
+        if self.pool:
+            self.pool.start()
         addr = self.server.sockets[0].getsockname()
-        print(f"[SERVER] Dinleniyor: {addr}")
+        self.bound_port = addr[1]
+        relay_log.info("Dinleniyor: %s", addr)
+
+    async def serve(self):
+        await self.listen()
         async with self.server:
             await self.server.serve_forever()
 
+    async def stop(self):
+        """Dinlemeyi bırakır, açık oturumları ve arka plan görevlerini kapatır."""
+        if self.server:
+            self.server.close()
+        for task in list(self.sessions):
+            task.cancel()
+        await asyncio.gather(*self.sessions, return_exceptions=True)
+        if self.server:
+            await self.server.wait_closed()
+        if self.pool:
+            await self.pool.stop()
+        await self.resolver.stop()
+        relay_log.info("Durduruldu: %s", self.local_port)
+
     async def start(self):
-        print("[SYSTEM] Gateway başlatılıyor...")
+        relay_log.info("Gateway başlatılıyor...")
         await self.fetch_ip()
         await self.serve()
 
+class GatewayManager:
+    """Birden fazla Gateway'i tek bir event loop üzerinde, her birini kendi
+    yerel portunda çalıştırır."""
+
+    def __init__(self, hub=None, loop=None, runtime=None):
+        self.hub = hub
+        self.loop = loop
+        self.runtime = runtime
+        self.thread = None
+        self.gateways = {}
+        self.lock = threading.Lock()
+        self.stats_server = None
+
+    def ensure_loop(self):
+        with self.lock:
+            if self.loop is None and self.runtime is not None:
+                self.loop = self.runtime.start()
+            elif self.loop is None:
+                self.loop = asyncio.new_event_loop()
+                self.thread = threading.Thread(target=self.loop.run_forever, daemon=True)
+                self.thread.start()
+        return self.loop
+
+    def submit(self, coro):
+        """Coroutine'i gateway loop'una gönderir, concurrent.futures.Future döner."""
+        return asyncio.run_coroutine_threadsafe(coro, self.ensure_loop())
+
+    async def start_gateway(self, ip_list, target_port, local_port=None):
+        """local_port üzerinde gateway açar; port doluysa eski gateway değiştirilir.
+
+        local_port=0 verilirse işletim sisteminin seçtiği boş port kullanılır.
+        """
+        if local_port is None:
+            local_port = int(os.getenv("Gateway_Port"))
+        current = self.gateways.get(local_port)
+        if current:
+            if current.ip_list == list(ip_list) and current.target_port == target_port:
+                return current
+            await self.stop_gateway(local_port)
+        gw = Gateway(list(ip_list), target_port, self.hub, local_port=local_port)
+        await gw.listen()
+        self.gateways[gw.local_port] = gw
+        if metrics.STATS_PORT and self.stats_server is None:
+            self.stats_server = metrics.StatsServer(self.snapshot, port=metrics.STATS_PORT)
+            await self.stats_server.start()
+        return gw
+
+    async def stop_gateway(self, local_port):
+        gw = self.gateways.pop(local_port, None)
+        if gw:
+            await gw.stop()
+
+    async def rebind(self, local_port, new_port):
+        gw = self.gateways.get(local_port)
+        if not gw:
+            raise KeyError(f"{local_port} portunda gateway yok")
+        await self.stop_gateway(local_port)
+        return await self.start_gateway(gw.ip_list, gw.target_port, new_port)
+
+    async def stop_all(self):
+        for local_port in list(self.gateways):
+            await self.stop_gateway(local_port)
+        if self.stats_server:
+            await self.stats_server.stop()
+            self.stats_server = None
+
+    def start(self, ip_list, target_port, local_port=None):
+        return self.submit(self.start_gateway(ip_list, target_port, local_port))
+
+    def stop(self, local_port):
+        return self.submit(self.stop_gateway(local_port))
+
+    def shutdown(self, timeout=5.0):
+        if self.loop is None:
+            return
+        self.submit(self.stop_all()).result(timeout)
+        if self.thread:
+            self.submit(self.loop.shutdown_default_executor()).result(timeout)
+            self.loop.call_soon_threadsafe(self.loop.stop)
+            self.thread.join(timeout)
+            self.loop.close()
+            self.loop = self.thread = None
+
+    def stats(self):
+        return {port: gw.stats() for port, gw in list(self.gateways.items())}
+
+    def relaying(self):
+        return any(gw.metrics.active for gw in list(self.gateways.values()))
+
+    def rtt_sample(self):
+        samples = [gw.rtt_sample() for gw in list(self.gateways.values())]
+        samples = [sample for sample in samples if sample is not None]
+        return min(samples) if samples else None
+
+    def totals(self):
+        """Tüm gateway sayaçlarının toplamı; GUI'nin periyodik okuması için ucuzdur."""
+        total = {"gateways": len(self.gateways)}
+        for stats in self.stats().values():
+            for key, value in stats.items():
+                total[key] = total.get(key, 0) + value
+        return total
+
+    def snapshot(self):
+        return {
+            "timestamp": time.time(),
+            "totals": self.totals(),
+            "gateways": {port: gw.snapshot() for port, gw in list(self.gateways.items())},
+        }
+
+
+class HubError(RuntimeError):
+    """HUB bir isteğe {"type": "error"} ile yanıt verdi."""
+
+
 class HUB:
-    def __init__(self, ip, port):
+    def __init__(self, ip, port, _runtime=None):
         self.IP = ip
         self.port = int(port)
         self.GW = None
+        self.runtime = _runtime or runtime.Runtime("hub")
+        self.gateways = GatewayManager(self, runtime=self.runtime)
         self.identifier = None
         self.reader = None
-        self.gw_loop = None
-        self.gw_thread = None
+        self.writer = None
+        # Handshake tamamlanınca set edilir; gönderim kuyruğu bağlantıyı bununla bekler.
+        self.ready = asyncio.Event()
+        self.public_ip = None
+        self.last_received = 0.0
+        # random modülü sabit tohumlu; jitter tüm istemcilerde aynı olmasın.
+        self.rng = random.Random()
+        self.cids = itertools.count(1)
+        self.pending = {}
         self.lock = threading.Lock()
-        self.servers_cache = []
+        self.registry = registry.ServerRegistry()
+        self.details = details.DetailCache()
+        self.registry.subscribe(self.forget_detail)
         self.loop = None
+        self.prober = prober.Prober()
         self.health_checker = HealthChecker(self)
-        self.write_lock = threading.Lock()
+        self.outbox = outbox.SendQueue(self)
         self.console_callback = None
+        self.codec = codec.JsonCodec()
+        # Handshake sırasında okunup dinleyiciye bırakılan byte'lar.
+        self.carry = b""
 
     async def listen_servers_broadcast(self):
+        """Bağlantı kapanana kadar HUB mesajlarını okur; kapanınca hata yükseltir
+        ve runtime bağlantıyı yeniden kurar."""
+        active = self.codec
+        decoder = framing.make_decoder(active.framing)
         while True:
             try:
-                data = await self.reader.read(2048)
-                if not data:
-                    await asyncio.sleep(0.5)
-                    continue
-                decoded = json.loads(data.decode())
-                self.console_log(decoded)
-                if decoded["data"]["type"] == "request" and decoded["data"]["value"] == "servers":
-                    servers = decoded["data"]["data"]
-                    if isinstance(servers, list):
-                        for item in servers:
-                            self.servers_cache.append(item)
-                        self.console_log(f"[INFO] Servers güncellendi: {len(servers)} adet sunucu.")
-                    else:
-                        self.console_log("[WARNING] Geçersiz server listesi formatı.")
+                if self.codec is not active:
+                    # Yeniden bağlantıda farklı bir codec anlaşılmış olabilir.
+                    active = self.codec
+                    decoder = framing.make_decoder(active.framing)
+                if self.carry:
+                    data, self.carry = self.carry, b""
+                else:
+                    if not self.check_connection():
+                        raise ConnectionError("HUB bağlantısı yok")
+                    data = await self.reader.read(framing.READ_SIZE)
+                    if not data:
+                        self.ready.clear()
+                        self.reader = self.writer = None
+                        raise ConnectionError("HUB bağlantıyı kapattı")
+                    self.last_received = time.monotonic()
+                for frame in decoder.feed(data):
+                    if len(frame) < DECODE_IN_THREAD:
+                        self.handle_message(frame)
+                        continue
+                    try:
+                        decoded = await asyncio.to_thread(active.decode, frame)
+                    except (ValueError, TypeError) as e:
+                        log.warning("Geçersiz mesaj (%d byte): %s", len(frame), e)
+                        continue
+                    self.handle_message(frame, decoded)
+            except framing.FrameError as e:
+                # Akış artık çerçeve sınırlarına hizalı değil; sonraki her çerçeve bozuk olur.
+                log.error("Broadcast çerçeve hatası, bağlantı yenileniyor: %s", e)
+                self.drop_connection()
+                raise ConnectionError(f"HUB çerçeve hatası: {e}") from e
             except Exception as e:
-                self.console_log(f"[ERROR] Broadcast dinleme hatası: {e}")
-                await asyncio.sleep(3)
+                log.error("Broadcast dinleme hatası: %s", e)
+                self.fail_pending(ConnectionError(f"HUB bağlantısı koptu: {e}"))
+                raise
+
+    def handle_message(self, frame, decoded=None):
+        """HUB'dan gelen tek bir çerçeveyi (önceden çözülmemişse) çözer ve işler."""
+        try:
+            if decoded is None:
+                decoded = self.codec.decode(frame)
+            data = decoded["data"]
+            if not isinstance(data, dict):
+                raise TypeError(f"data bir nesne değil: {type(data).__name__}")
+        except (ValueError, KeyError, TypeError) as e:
+            log.warning("Geçersiz mesaj (%d byte): %s", len(frame), e)
+            return
+        if log.isEnabledFor(console.DEBUG):
+            log.debug("Mesaj alındı: %s/%s (%d byte)", data.get("type"), data.get("value"), len(frame))
+        cid = decoded.get("cid")
+        if cid is not None and cid in self.pending:
+            self.resolve(cid, data)
+            return
+        if data.get("type") == "resume":
+            self.resumed(data)
+            return
+        try:
+            changed = self.registry.apply(data)
+        except (ValueError, KeyError, TypeError) as e:
+            log.warning("Mesaj uygulanamadı: %s", e)
+            return
+        if changed:
+            log.debug("Servers güncellendi: %d değişiklik, toplam %d sunucu.", changed, len(self.registry))
+
+    async def run_session(self):
+        await self.start()
+        await self.listen_servers_broadcast()
+
+    def launch(self):
+        """HUB bağlantısı/dinleyici, heartbeat ve sağlık raporunu runtime'da başlatır."""
+        self.loop = self.runtime.start()
+        self.runtime.on_shutdown(self.close)
+        self.runtime.on_shutdown(self.gateways.stop_all)
+        self.runtime.supervise("hub", self.run_session)
+        self.runtime.supervise("heartbeat", self.heartbeat)
+        self.runtime.supervise("health", self.health_checker.loop)
 
-    def start_broadcast_listener(self):
-        def thread_target():
-            if not self.loop:
-                raise RuntimeError("Event loop henüz ayarlanmadı. 'startHUB()' tamamlanmalı.")
-            loop = self.loop
-            asyncio.set_event_loop(loop)
-            loop.run_until_complete(self.listen_servers_broadcast())
+    async def close(self):
+        await self.outbox.stop()
+        self.ready.clear()
+        if self.writer:
+            self.writer.close()
+        self.reader = self.writer = None
 
-        threading.Thread(target=thread_target, daemon=True).start()
+    def shutdown(self, timeout=5.0):
+        if isinstance(self.GW, workers.GatewayWorkers):
+            self.GW.stop()
+        self.runtime.shutdown(timeout)
 
     def set_console_callback(self, callback):
-        """GUI konsoluna mesaj göndermek için callback ayarla."""
-        self.console_callback = callback
-        
-    def scanServer(self):
-        if len(self.servers_cache) > 1:
-            return self.servers_cache.pop(0)
-        return None
-
-    def console_log(self, message):
-        """Konsola, log dosyasına ve GUI’ye mesaj gönder."""
-        print(message, flush=True)
-        logging.info(message)
+        """GUI konsolu için callback ayarla; satırlar log thread'inden toplu halde gelir.
+
+        Tk widget'ına yazacak callback'ler kendi thread'ine geçmelidir
+        (ör. TkBridge.post) ya da console.read() ile tamponu periyodik okumalıdır.
+        """
         if self.console_callback:
-            try:
-                self.console_callback(f"{message}\n")
-            except Exception as e:
-                print(f"[ERROR] GUI log hatası: {e}", flush=True)
-                
-    def write_thread(self, package):
-        """Veriyi ayrı bir thread'de thread-safe şekilde gönderir."""
-        def thread_target():
-            self.console_log(f"[DEBUG] write_thread çağrıldı: {package['data']['type']} (Thread ID: {threading.get_ident()})")
-            if not self.loop:
-                self.console_log("[ERROR] Event loop başlatılmadı")
-                return
-            try:
-                self.console_log(f"[DEBUG] Loop durumu: Çalışıyor mu: {self.loop.is_running()}, Kapalı mı: {self.loop.is_closed()}")
-                future = asyncio.run_coroutine_threadsafe(self.write(package), self.loop)
-                future.result()
-                self.console_log(f"[DEBUG] write_thread tamamlandı: {package['data']['type']}")
-            except Exception as e:
-                self.console_log(f"[ERROR] Thread-safe yazma hatası: {e}\n{traceback.format_exc()} (Paket: {package['data']['type']})")
-        
-        threading.Thread(target=thread_target, daemon=True).start()
-    
+            console.unsubscribe(self.console_callback)
+            self.console_callback = None
+        if callback:
+            self.console_callback = lambda lines: callback("".join(f"{line}\n" for line in lines))
+            console.subscribe(self.console_callback)
+
+
+    def send(self, package):
+        """Herhangi bir thread'den engellemeden gönderir; bkz. SendQueue.send."""
+        future = self.outbox.send(package)
+        future.add_done_callback(self.log_send_error)
+        return future
+
+    def log_send_error(self, future):
+        if not future.cancelled() and future.exception():
+            log.error("Gönderilemedi: %r", future.exception())
+
     def joinServer(self, server, username, password):
+        """GUI thread'inden çağrılır; ping ölçümü ve gönderim runtime'da yapılır."""
+        return self.runtime.submit(self.join_server(server, username, password))
+
+    async def ping_server(self, server):
+        """Sunucu IP'lerinin ortalama gecikmesi (ms); hiçbiri yanıt vermezse None."""
+        return await self.prober.average(server["IP"], server.get("Port"))
+
+    async def join_server(self, server, username, password):
         username = username.strip()
         password = password.strip()
         ip = self.public_ip
@@ -197,127 +507,313 @@ class HUB:
             username = "unknown"
         else:
             password = hashlib.md5(password.encode()).hexdigest()
-        try:
-            ping = check_ping(server["IP"])
-        except:
-            print("Ping Error with ",server["IP"])
+        self.health_checker.watch(server["ID"])
+        ping = await self.ping_server(server)
+        if ping is None:
+            log.warning("Ping yanıtı yok: %s", server["IP"])
             ping = 50
         package = {
                     "id": self.identifier,
                     "data": {"type": "join", "target":server["ID"], "ping":ping, "username":username,"password":password,"ip":ip},
                     "timestamp": time.time()
                     }
-        self.write_thread(package)
+        self.send(package)
 
     async def inform_health(self):
         try:
             if not self.identifier:
-                print("No identifier, skipping inform_health")
+                log.debug("Kimlik yok, sağlık raporu atlandı")
                 return
             _package = await self.health_checker.get_data_hub()
             package = create_message(self.identifier, "info", _package)
-            self.write_thread(package)
+            # Sağlık döngüsü HUB yavaş ya da kopukken beklememeli; kuyruk doluysa rapor düşer.
+            self.send(package)
         except Exception as e:
-            print("Health Check Error:", e, type(e))
+            log.error("Sağlık raporu gönderilemedi: %r", e)
 
     def check_connection(self):
+        """Handshake'i tamamlanmış bir bağlantı var mı; handshake sürerken False döner."""
         with self.lock:
-            if self.reader:
-                return True
-            return False
+            return self.reader is not None and self.ready.is_set()
     
     async def connect(self):
         try:
-            self.reader, self.writer = await asyncio.open_connection(self.IP, self.port)
-            print("HUB Connected")
+            self.reader, self.writer = await asyncio.wait_for(
+                asyncio.open_connection(self.IP, self.port), timeout=HUB_CONNECT_TIMEOUT
+            )
+            self.set_keepalive(self.writer)
+            log.info("HUB bağlandı: %s:%s", self.IP, self.port)
             if self.reader:
-                await self.handshake()
+                await asyncio.wait_for(self.handshake(), timeout=HUB_CONNECT_TIMEOUT + codec.NEGOTIATE_TIMEOUT)
+                self.last_received = time.monotonic()
+                self.ready.set()
                 return True
         except Exception as e:
-            self.reader = self.writer = None
-            print("HUB Not Connected ",e)
+            self.drop_connection()
+            log.warning("HUB bağlanamadı: %r", e)
             return False
 
+    def set_keepalive(self, writer):
+        """Ölü HUB bağlantısının çekirdek tarafından saniyeler içinde fark edilmesini sağlar."""
+        sock = writer.get_extra_info("socket")
+        if sock is None:
+            return
+        idle = max(1, int(HEARTBEAT_INTERVAL))
+        try:
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+            if hasattr(socket, "TCP_KEEPIDLE"):
+                sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_KEEPIDLE, idle)
+                sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_KEEPINTVL, 3)
+                sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_KEEPCNT, 3)
+            elif hasattr(socket, "SIO_KEEPALIVE_VALS"):
+                sock.ioctl(socket.SIO_KEEPALIVE_VALS, (1, idle * 1000, 3000))
+            if hasattr(socket, "TCP_USER_TIMEOUT"):
+                # Onaylanmayan veri bu süreyi aşarsa bağlantı kapanır.
+                sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_USER_TIMEOUT, idle * 2000)
+        except OSError as e:
+            log.warning("Keepalive ayarlanamadı: %s", e)
+
+    def drop_connection(self):
+        """Bağlantıyı hemen keser; bekleyen read() EOF alır ve dinleyici yeniden bağlanır."""
+        writer = self.writer
+        self.ready.clear()
+        self.reader = self.writer = None
+        if writer is not None:
+            writer.transport.abort()
+        self.fail_pending(ConnectionError("HUB bağlantısı kesildi"))
+
     async def read(self):
         return await self.reader.read(1024)
 
     async def write(self, package):
-        """Veri yazar."""
-        with self.write_lock:  # Yazma işlemlerini senkronize et
-            try:
-                self.console_log(f"[DEBUG] write çağrıldı: {package['data']['type']} (Paket: {package})")
-                if not self.check_connection():
-                    self.console_log("[WARNING] Bağlantı yok, yeniden bağlanılıyor...")
-                    await self.connect()
-                    if not self.check_connection():
-                        raise ValueError("Bağlantı sağlanamadı")
-                self.console_log(f"[DEBUG] Writer durumu: {self.writer}, Kapalı mı: {self.writer.is_closing()}")
-                package_data = json.dumps(package).encode() + b'\n'  # Yeni satır ayırıcısı ekle
-                self.console_log("[DEBUG] Veri yazılıyor...")
-                self.writer.write(package_data)
-                await asyncio.wait_for(self.writer.drain(), timeout=5)
-                self.console_log(f"[INFO] Veri gönderildi: {package['data']['type']}")
-            except Exception as e:
-                self.console_log(f"[ERROR] Veri yazma hatası: {e}\n{traceback.format_exc()}")
-                self.reader = self.writer = None
-                raise
+        """Paketi gönderim kuyruğuna ekler ve gönderilene kadar bekler."""
+        future = await self.outbox.put(package)
+        await future
+
+    async def write_direct(self, package):
+        """Kuyruğu atlayarak yazar; yalnızca yazıcının beklediği handshake için."""
+        self.writer.write(self.codec.frame(package))
+        await asyncio.wait_for(self.writer.drain(), timeout=outbox.WRITE_TIMEOUT)
         
     async def heartbeat(self):
         while True:
-            await asyncio.sleep(10)  # Her 10 saniyede bir
-            if self.writer and self.identifier:
-                try:
-                    package = {
-                        "id": self.identifier,
-                        "data": {"type": "Heartbeat"},
-                        "timestamp": time.time()
-                    }
-                    await self.write(package)
-                except Exception as e:
-                    print(f"[HUB] Heartbeat gönderilemedi: {e}")
-                    
+            await asyncio.sleep(HEARTBEAT_INTERVAL)
+            if not (self.writer and self.identifier):
+                continue
+            if DEAD_AFTER and time.monotonic() - self.last_received > DEAD_AFTER:
+                log.warning("%.0f sn'dir veri yok, bağlantı yenileniyor", DEAD_AFTER)
+                self.drop_connection()
+                continue
+            try:
+                package = {
+                    "id": self.identifier,
+                    "data": {"type": "Heartbeat", "ack": self.registry.seq},
+                    "timestamp": time.time()
+                }
+                await asyncio.wait_for(self.write(package), timeout=HEARTBEAT_INTERVAL)
+            except Exception as e:
+                log.warning("Heartbeat gönderilemedi: %r", e)
+                self.drop_connection()
+
     async def handshake(self):
         data = await self.read()
-        if data:
-            self.identifier = data.decode()
-        else:
-            return
+        if not data:
+            raise ConnectionError("HUB kimlik göndermedi")
+        previous, self.identifier = self.identifier, data.decode()
+        self.codec = codec.JsonCodec()
+        self.carry = b""
         package = {
             "id": self.identifier,
             "data": {
                 "type": "Client",
                 "client_ip": self.public_ip,
-                "client_port": self.port
+                "client_port": self.port,
+                "codecs": codec.offered(),
+                # Listede yalnızca bu alanlar gerekir; detaylar server_detail ile istenir.
+                "list_fields": list(details.SUMMARY_FIELDS)
             },
             "timestamp": time.time()
         }
-        await self.write(package)
+        if previous and self.registry.seq:
+            # HUB oturumu tanırsa yalnızca seq'ten sonraki değişiklikleri gönderir.
+            package["data"]["resume"] = {"id": previous, "seq": self.registry.seq}
+        await self.write_direct(package)
+        if package["data"]["codecs"] != ["json"]:
+            await self.negotiate_codec()
+
+    async def negotiate_codec(self):
+        """HUB'ın codec seçimini bekler; yanıt gelmezse JSON ile devam edilir.
+
+        Codec'i bilen HUB, Client paketine {"type": "codec", "value": ad} satırıyla
+        yanıt verir ve sonraki tüm çerçeveler o codec ile gönderilir. Eski HUB'lar
+        hiç yanıt vermez ya da doğrudan normal bir mesaj (ör. büyük sunucu
+        listesi) yollar. Yanıttan sonra ya da yanıt yerine okunan byte'lar
+        self.carry'de dinleyiciye bırakılır; satır boyu sınırı yoktur.
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + codec.NEGOTIATE_TIMEOUT
+        buffer = bytearray()
+        while b"\n" not in buffer and len(buffer) <= codec.NEGOTIATE_MAX:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            try:
+                data = await asyncio.wait_for(self.reader.read(framing.READ_SIZE), remaining)
+            except asyncio.TimeoutError:
+                break
+            if not data:
+                break
+            buffer += data
+            self.last_received = time.monotonic()
+        self.carry = bytes(buffer)
+        end = buffer.find(b"\n")
+        if end < 0 or end > codec.NEGOTIATE_MAX:
+            return
+        try:
+            data = json.loads(buffer[:end])["data"]
+        except (ValueError, KeyError, TypeError):
+            data = None
+        if not isinstance(data, dict) or data.get("type") != "codec":
+            return
+        self.codec = codec.get(data.get("value"))
+        self.carry = bytes(buffer[end + 1:])
+        log.info("HUB codec: %s", self.codec.name)
+
+    async def request(self, msg_type, data=None, timeout=REQUEST_TIMEOUT):
+        """cid ile bir istek gönderir ve aynı cid'li yanıtın data kısmını döndürür.
+
+        Aynı bağlantı üzerinden birçok istek eşzamanlı bekleyebilir. Süre
+        dolarsa asyncio.TimeoutError, HUB hata döndürürse HubError, bağlantı
+        koparsa ConnectionError yükselir.
+        """
+        cid = next(self.cids)
+        future = asyncio.get_running_loop().create_future()
+        self.pending[cid] = future
+        try:
+            await self.write(create_message(self.identifier, msg_type, data or {}, cid))
+            return await asyncio.wait_for(future, timeout)
+        finally:
+            self.pending.pop(cid, None)
+
+    async def fetch_server_detail(self, server_id, fields=None, timeout=REQUEST_TIMEOUT):
+        """Tek sunucunun detay alanlarını (ör. description, rank, ping_last_1_hours) ister."""
+        data = {"value": "server_detail", "target": server_id}
+        if fields:
+            data["fields"] = list(fields)
+        response = await self.request("request", data, timeout)
+        return response.get("data") or {}
+
+    async def server_detail(self, server_id):
+        """Sunucunun ağır alanları (details.DETAIL_FIELDS).
+
+        HUB tam kayıt gönderiyorsa registry'deki kayıt kullanılır; aksi halde
+        HUB'dan istenir ve DetailCache'te tutulur.
+        """
+        server = self.registry.get(server_id)
+        local = details.detail(server) if server else None
+        if local is not None:
+            return local
+        return await self.details.fetch(
+            server_id, lambda: self.fetch_server_detail(server_id, details.DETAIL_FIELDS)
+        )
+
+    async def prefetch_details(self, server_ids):
+        await asyncio.gather(*(self.server_detail(server_id) for server_id in server_ids), return_exceptions=True)
+
+    def prefetch(self, server_ids):
+        """Komşu satırların detaylarını arka planda önbelleğe alır."""
+        if server_ids and self.check_connection():
+            self.runtime.submit(self.prefetch_details(server_ids))
+
+    def forget_detail(self, event, server_id, server):
+        if event == registry.REMOVE:
+            self.details.invalidate(server_id)
+
+    def resolve(self, cid, data):
+        future = self.pending.pop(cid)
+        if future.done():
+            return
+        if data.get("type") == "error":
+            future.set_exception(HubError(data.get("value") or "HUB hatası"))
+        else:
+            future.set_result(data)
+
+    def fail_pending(self, exc):
+        pending, self.pending = self.pending, {}
+        for future in pending.values():
+            if not future.done():
+                future.set_exception(exc)
+
+    def resumed(self, data):
+        """HUB'ın resume yanıtı: {"type": "resume", "value": "ok"|"full", "id": eski kimlik}.
+
+        "ok" ise eski kimlik geri alınır ve ardından yalnızca delta gelir;
+        "full" ise HUB oturumu tanımamıştır ve full=True işaretli tam liste gönderir.
+        """
+        if data.get("value") == "ok" and data.get("id"):
+            self.identifier = data["id"]
+        log.info("HUB oturumu: %s (seq %d)", data.get("value"), self.registry.seq)
         
     async def fetch_ip(self):
         try:
             async with aiohttp.ClientSession() as session:
                 async with session.get('https://api.ipify.org') as response:
                     self.public_ip = await response.text()
-                    print(f"[INFO] Public IP alınan: {self.public_ip}")
+                    log.info("Public IP alınan: %s", self.public_ip)
         except Exception as e:
-            print(f"[fetch_ip] IP alınamadı: {e}")
+            log.warning("Public IP alınamadı: %s", e)
             self.public_ip = "0.0.0.0"
     
-    def startGateWay(self, iplist, port):
-        def runner():
-            self.gw_loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(self.gw_loop)
-            self.GW = Gateway(iplist, port, self)
-            self.gw_loop.run_until_complete(self.GW.start())
-
-        self.gw_thread = threading.Thread(target=runner, daemon=True)
-        self.gw_thread.start()
+    async def start_gateway(self, iplist, port, local_port=None):
+        """Gateway'i (veya worker'ları) başlatır; başarısız olursa None döner."""
+        try:
+            if workers.enabled():
+                if isinstance(self.GW, workers.GatewayWorkers):
+                    await asyncio.to_thread(self.GW.stop)
+                self.GW = workers.GatewayWorkers(iplist, port)
+                await asyncio.to_thread(self.GW.start)
+            else:
+                self.GW = await self.gateways.start_gateway(iplist, port, local_port)
+        except Exception as e:
+            log.error("Gateway başlatılamadı: %s", e)
+            return None
         return self.GW
+
+    def startGateWay(self, iplist, port, local_port=None):
+        """Runtime dışındaki thread'ler için engelleyen sürüm."""
+        return self.runtime.submit(self.start_gateway(iplist, port, local_port)).result(timeout=10)
     
+    def passive_rtt(self):
+        """Gateway'den geçen oyun trafiğinden ölçülen gecikme (ms); ölçüm yoksa None.
+
+        Worker işlemlerindeki oturumlara bu işlemden erişilemez.
+        """
+        if isinstance(self.GW, workers.GatewayWorkers):
+            return None
+        return self.gateways.rtt_sample()
+
+    def relaying(self):
+        """Bu işlemdeki gateway'lerde açık oyun oturumu var mı."""
+        return not isinstance(self.GW, workers.GatewayWorkers) and self.gateways.relaying()
+
+    def gateway_stats(self):
+        """Aktif gateway(ler)in toplam sayaçları."""
+        if isinstance(self.GW, workers.GatewayWorkers):
+            return self.GW.stats()
+        return self.gateways.totals()
+
     async def start(self):
-        await self.fetch_ip()
+        self.outbox.start()
+        if self.public_ip is None:
+            await self.fetch_ip()
+        delay = RECONNECT_MIN
         while not self.check_connection():
-            await self.connect()
+            if await self.connect():
+                break
+            wait = self.rng.uniform(0, delay)
+            log.info("%.1f sn sonra tekrar denenecek", wait)
+            await asyncio.sleep(wait)
+            delay = min(delay * 2, RECONNECT_MAX)
 
 if __name__ == "__main__":
     Server_GWIPs = [
@@ -1,13 +1,24 @@
 import os
 import asyncio
 import aiohttp
-import psutil
-from time import time
-from ping3 import ping
+from time import time, monotonic
 from dotenv import load_dotenv
+from core import console, history, measures, processes, prober
 
 load_dotenv()
 
+log = console.get("health")
+
+# HUB'a sağlık raporu gönderme aralığı (saniye).
+REPORT_INTERVAL = 30
+# Bağlantı durumu ve ping örnekleme aralığı (saniye).
+SAMPLE_INTERVAL = float(os.getenv("Health_Sample_Interval") or 1)
+# Relay yokken oyun sunucusuna en fazla bu aralıkla ping atılır (saniye); TCP'ye
+# düşüldüğünde her ping sunucuya bir bağlantı açtığından örnekleme aralığından seyrek tutulur.
+PROBE_INTERVAL = max(SAMPLE_INTERVAL, float(os.getenv("Health_Probe_Interval") or 5))
+# Bu süreden uzun süren ping kayıp sayılır; örnekleme aralığını geçmemeli.
+PING_TIMEOUT = min(2.0, SAMPLE_INTERVAL)
+
 class HealthChecker:
     def __init__(self, parent):
         self.process_name = os.getenv("client_name")
@@ -16,60 +27,59 @@ class HealthChecker:
         self.hub_host = os.getenv("HUB_HOST")
         self.status = False
         self.measures = {"status": False, "ping_latency": 0, "packet_loss_count": 0, "timestamp": 0}
-        self.measuredb = {key: [] for key in self.measures}
-        self.maxSize = 60 * 5
+        self.store = measures.MeasureStore(SAMPLE_INTERVAL)
+        self.prober = prober.Prober(timeout=PING_TIMEOUT)
         self.connection = (None, None, None, None)
         self.parent = parent
+        self.clients = processes.ClientProcesses(self.process_name, (self.gw_port, self.hub_port))
+        self.probed_at = None
+        self.server_id = None
+        self.history = None
+
+    def watch(self, server_id):
+        """İzlenen sunucuyu değiştirir; sunucunun kayıtlı geçmişi ölçüm pencerelerine yüklenir."""
+        if server_id == self.server_id:
+            return
+        if self.history:
+            self.history.close()
+            self.history = None
+        self.server_id = server_id
+        self.store = measures.MeasureStore(SAMPLE_INTERVAL)
+        try:
+            self.history = history.open_server(server_id, SAMPLE_INTERVAL)
+        except (OSError, ValueError) as e:
+            log.warning("Sağlık geçmişi açılamadı (%s): %s", server_id, e)
+            return
+        # Örnekler arasındaki ve son örnekten bu yana geçen boş aralıklar
+        # işlenir; eski örnekler 1m/5m pencerelerinde güncelmiş gibi kalmaz.
+        previous, loaded = None, 0
+        for timestamp, status, latency in self.history.samples():
+            if previous is not None:
+                self.store.skip(round((timestamp - previous) / SAMPLE_INTERVAL) - 1, previous)
+            self.store.add(status, latency, timestamp)
+            previous, loaded = timestamp, loaded + 1
+        if previous is not None:
+            self.store.skip(round((time() - previous) / SAMPLE_INTERVAL) - 1)
+        log.info("Sağlık geçmişi yüklendi (%s): %s örnek", server_id, loaded)
 
     def add_measure(self, measure):
-        for key in measure:
-            if len(self.measuredb[key]) >= self.maxSize:
-                self.measuredb[key].pop(0)
-            self.measuredb[key].append(measure[key])
+        # Ping atılamadıysa (bağlantı yok) ping_latency None'dır.
+        self.store.add(measure["status"], measure["ping_latency"], measure["timestamp"])
+        if self.history:
+            self.history.append(measure["status"], measure["ping_latency"], measure["timestamp"])
 
     def get_measure_avg(self):
-        _timestamp = self.measuredb["timestamp"]
-        if not _timestamp:
-            return {key: 0 for key in self.measuredb}
-        
-        ret_measure = {}
-        for key in self.measuredb:
-            measure = self.measuredb[key]
-            if not measure:
-                ret_measure[key] = 0
-                continue
-            if key == "status":
-                ret_measure[key] = sum(1 for m in measure if m) / len(measure)
-            elif key == "packet_loss_count":
-                ret_measure[key] = sum(measure)
-            else:
-                ret_measure[key] = sum(measure) / len(measure) if measure else 0
-        return ret_measure
+        return self.store.report()
 
     def get_active_connection(self):
         try:
-            valid_pids = {
-                p.info['pid']
-                for p in psutil.process_iter(attrs=['pid', 'name'])
-                if self.process_name in p.info['name'].lower()
-            }
-            if not valid_pids:
-                return None, None, None, None
-
-            for conn in psutil.net_connections(kind='tcp'):
-                if conn.status == psutil.CONN_ESTABLISHED and conn.pid in valid_pids:
-                    laddr, raddr = conn.laddr, conn.raddr
-                    if laddr and raddr and raddr.port not in (self.gw_port, self.hub_port) and laddr.port not in (self.gw_port, self.hub_port):
-                        if raddr.ip == "127.0.0.1":  # Yerel bağlantıları ignore et
-                            continue
-                        self.status = True
-                        return laddr.ip, laddr.port, raddr.ip, raddr.port
-            self.status = False
-            return None, None, None, None
+            connection = self.clients.active_connection()
         except Exception as e:
-            print(f"Error checking connection: {e}")
-            self.status = False
-            return None, None, None, None
+            log.warning("Bağlantı kontrolü başarısız: %s", e)
+            self.clients.invalidate()
+            connection = processes.NO_CONNECTION
+        self.status = connection[0] is not None
+        return connection
 
     def check_connection(self):
         self.connection = self.get_active_connection()
@@ -79,47 +89,65 @@ class HealthChecker:
 
     async def update_measure(self):
         try:
-            if self.connection[2]:
-                ping_latency = ping(self.connection[2], timeout=2)
+            passive = self.parent.passive_rtt() if self.parent else None
+            if passive is not None:
+                # Gateway'den geçen trafikten ölçüldü; ek paket gönderilmez.
+                self.measures["ping_latency"] = passive
+            elif self.parent and self.parent.relaying():
+                # Oturum açık ama bu aralıkta istek-yanıt olmadı; yine de ping atılmaz.
+                self.measures["ping_latency"] = None
+            elif self.connection[2] and self.probed_at is not None and monotonic() - self.probed_at < PROBE_INTERVAL:
+                # Ping sırası gelmedi; bu örnek yalnızca bağlantı durumunu taşır.
+                self.measures["ping_latency"] = None
+            elif self.connection[2]:
+                self.probed_at = monotonic()
+                ping_latency = await self.prober.probe(self.connection[2], self.connection[3])
                 if ping_latency is not None:
-                    self.measures["ping_latency"] = ping_latency * 1000
+                    self.measures["ping_latency"] = ping_latency
                 else:
                     self.measures["ping_latency"] = float('inf')
                     self.measures["packet_loss_count"] += 1
             else:
-                print("No valid remote IP for ping")
-                self.measures["ping_latency"] = float('inf')
+                log.debug("Ping için uzak IP yok")
+                self.measures["ping_latency"] = None
             self.measures["status"] = self.status
             self.measures["timestamp"] = time()
         except Exception as e:
-            print(f"update_measure error: {e}")
+            log.warning("Ölçüm hatası: %s", e)
             self.measures["ping_latency"] = float('inf')
             self.measures["packet_loss_count"] += 1
             self.measures["status"] = self.status
             self.measures["timestamp"] = time()
 
-    async def get_data_hub(self):
-        print("Checking connection")  # Debug
-        self.check_connection()
-        print("Updating measure")  # Debug
+    async def sample(self):
+        await asyncio.to_thread(self.check_connection)
         await self.update_measure()
-        print("Adding measure")  # Debug
         self.add_measure(self.measures)
-        print("Getting measure avg")  # Debug
+
+    async def get_data_hub(self):
+        if not self.store.total:
+            await self.sample()
         avg_measures = self.get_measure_avg()
-        print("get_data_hub result:", avg_measures)  # Debug
+        log.debug("Sağlık ortalaması: %s", avg_measures)
         return avg_measures
 
     async def loop(self):
-        print("HealthChecker Loop Started")
+        """Her SAMPLE_INTERVAL'da örnek alır, REPORT_INTERVAL'da bir HUB'a rapor gönderir."""
+        log.info("HealthChecker döngüsü başladı")
+        loop = asyncio.get_running_loop()
+        next_sample = next_report = loop.time()
         while True:
-            self.check_connection()
-            await self.update_measure()
-            self.add_measure(self.measures)
-            avg_measures = self.get_measure_avg()
-            await self.send_to_hub(avg_measures)
-            print(f"Measures: {self.measures}")
-            await asyncio.sleep(30)
+            await self.sample()
+            log.debug("Ölçümler: %s", dict(self.measures))
+            if loop.time() >= next_report:
+                await self.parent.inform_health()
+                if self.history:
+                    self.history.flush()
+                next_report = loop.time() + REPORT_INTERVAL
+            next_sample += SAMPLE_INTERVAL
+            # Geride kalındıysa kaçırılan örnekler telafi edilmez.
+            next_sample = max(next_sample, loop.time())
+            await asyncio.sleep(next_sample - loop.time())
 
 if __name__ == "__main__":
     HC = HealthChecker()
@@ -0,0 +1,288 @@
+import os
+import json
+import zlib
+import struct
+import dotenv
+
+from core import framing
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+# Saf Python msgpack (ya da bu modüldeki yedek kodlayıcı) JSON'dan yavaştır;
+# ikili codec'ler yalnızca C eklentisi yüklüyse kendiliğinden önerilir.
+NATIVE_MSGPACK = msgpack is not None and getattr(msgpack.Unpacker, "__module__", "") != "msgpack.fallback"
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+dotenv.load_dotenv()
+
+# Handshake'te HUB'a önerilecek codec'ler, virgülle ayrılmış ve tercih sırasıyla.
+# Boşsa kurulu olanların hepsi önerilir; "json" yazılırsa eski protokol zorlanır.
+CODECS = os.getenv("HUB_Codecs") or ""
+# HUB'ın codec yanıtı için beklenecek en uzun süre (saniye).
+NEGOTIATE_TIMEOUT = float(os.getenv("HUB_Codec_Timeout") or 1.0)
+# Codec yanıtı kısa bir satırdır; satır sonu gelmeden bundan fazla veri gelirse
+# yanıt değil, codec bilmeyen HUB'ın normal mesajıdır.
+NEGOTIATE_MAX = 4096
+# Bu boyuttan küçük yükler sıkıştırılmaz; heartbeat gibi mesajlarda kazanç yok.
+COMPRESS_MIN = 256
+RAW = 0
+ZLIB = 1
+ZSTD = 2
+
+
+def pack(obj):
+    """msgpack biçiminde kodlar (None, bool, int, float, str, bytes, list, dict)."""
+    if msgpack is not None:
+        return msgpack.packb(obj, use_bin_type=True)
+    out = bytearray()
+    _pack(obj, out)
+    return bytes(out)
+
+
+def _pack(obj, out):
+    if obj is None:
+        out.append(0xC0)
+    elif obj is True:
+        out.append(0xC3)
+    elif obj is False:
+        out.append(0xC2)
+    elif isinstance(obj, int):
+        if 0 <= obj < 0x80:
+            out.append(obj)
+        elif -32 <= obj < 0:
+            out.append(obj & 0xFF)
+        elif 0 <= obj <= 0xFF:
+            out += b"\xcc" + struct.pack(">B", obj)
+        elif 0 <= obj <= 0xFFFF:
+            out += b"\xcd" + struct.pack(">H", obj)
+        elif 0 <= obj <= 0xFFFFFFFF:
+            out += b"\xce" + struct.pack(">I", obj)
+        elif 0 <= obj:
+            out += b"\xcf" + struct.pack(">Q", obj)
+        elif -0x80 <= obj:
+            out += b"\xd0" + struct.pack(">b", obj)
+        elif -0x8000 <= obj:
+            out += b"\xd1" + struct.pack(">h", obj)
+        elif -0x80000000 <= obj:
+            out += b"\xd2" + struct.pack(">i", obj)
+        else:
+            out += b"\xd3" + struct.pack(">q", obj)
+    elif isinstance(obj, float):
+        out += b"\xcb" + struct.pack(">d", obj)
+    elif isinstance(obj, str):
+        data = obj.encode()
+        n = len(data)
+        if n < 32:
+            out.append(0xA0 | n)
+        elif n <= 0xFF:
+            out += b"\xd9" + struct.pack(">B", n)
+        elif n <= 0xFFFF:
+            out += b"\xda" + struct.pack(">H", n)
+        else:
+            out += b"\xdb" + struct.pack(">I", n)
+        out += data
+    elif isinstance(obj, (bytes, bytearray)):
+        n = len(obj)
+        if n <= 0xFF:
+            out += b"\xc4" + struct.pack(">B", n)
+        elif n <= 0xFFFF:
+            out += b"\xc5" + struct.pack(">H", n)
+        else:
+            out += b"\xc6" + struct.pack(">I", n)
+        out += obj
+    elif isinstance(obj, (list, tuple)):
+        n = len(obj)
+        if n < 16:
+            out.append(0x90 | n)
+        elif n <= 0xFFFF:
+            out += b"\xdc" + struct.pack(">H", n)
+        else:
+            out += b"\xdd" + struct.pack(">I", n)
+        for item in obj:
+            _pack(item, out)
+    elif isinstance(obj, dict):
+        n = len(obj)
+        if n < 16:
+            out.append(0x80 | n)
+        elif n <= 0xFFFF:
+            out += b"\xde" + struct.pack(">H", n)
+        else:
+            out += b"\xdf" + struct.pack(">I", n)
+        for key, value in obj.items():
+            _pack(key, out)
+            _pack(value, out)
+    else:
+        raise TypeError(f"Kodlanamayan tip: {type(obj).__name__}")
+
+
+_FIXED = {
+    0xCC: struct.Struct(">B"), 0xCD: struct.Struct(">H"), 0xCE: struct.Struct(">I"), 0xCF: struct.Struct(">Q"),
+    0xD0: struct.Struct(">b"), 0xD1: struct.Struct(">h"), 0xD2: struct.Struct(">i"), 0xD3: struct.Struct(">q"),
+    0xCA: struct.Struct(">f"), 0xCB: struct.Struct(">d"),
+}
+_LEN = {
+    0xD9: struct.Struct(">B"), 0xDA: struct.Struct(">H"), 0xDB: struct.Struct(">I"),
+    0xC4: struct.Struct(">B"), 0xC5: struct.Struct(">H"), 0xC6: struct.Struct(">I"),
+    0xDC: struct.Struct(">H"), 0xDD: struct.Struct(">I"),
+    0xDE: struct.Struct(">H"), 0xDF: struct.Struct(">I"),
+}
+
+
+def unpack(data):
+    if msgpack is not None:
+        return msgpack.unpackb(data, raw=False, strict_map_key=False)
+    obj, offset = _unpack(data, 0)
+    if offset != len(data):
+        raise ValueError("msgpack verisinin sonunda fazladan byte var")
+    return obj
+
+
+def _unpack(data, offset):
+    tag = data[offset]
+    offset += 1
+    if tag < 0x80:
+        return tag, offset
+    if tag >= 0xE0:
+        return tag - 0x100, offset
+    if 0xA0 <= tag <= 0xBF:
+        n = tag & 0x1F
+        return data[offset:offset + n].decode(), offset + n
+    if 0x90 <= tag <= 0x9F:
+        return _unpack_array(data, offset, tag & 0x0F)
+    if 0x80 <= tag <= 0x8F:
+        return _unpack_map(data, offset, tag & 0x0F)
+    if tag == 0xC0:
+        return None, offset
+    if tag == 0xC2:
+        return False, offset
+    if tag == 0xC3:
+        return True, offset
+    fixed = _FIXED.get(tag)
+    if fixed is not None:
+        return fixed.unpack_from(data, offset)[0], offset + fixed.size
+    length = _LEN.get(tag)
+    if length is None:
+        raise ValueError(f"Desteklenmeyen msgpack etiketi: 0x{tag:02X}")
+    n = length.unpack_from(data, offset)[0]
+    offset += length.size
+    if tag in (0xD9, 0xDA, 0xDB):
+        return data[offset:offset + n].decode(), offset + n
+    if tag in (0xC4, 0xC5, 0xC6):
+        return bytes(data[offset:offset + n]), offset + n
+    if tag in (0xDC, 0xDD):
+        return _unpack_array(data, offset, n)
+    return _unpack_map(data, offset, n)
+
+
+def _unpack_array(data, offset, n):
+    items = []
+    for _ in range(n):
+        item, offset = _unpack(data, offset)
+        items.append(item)
+    return items, offset
+
+
+def _unpack_map(data, offset, n):
+    result = {}
+    for _ in range(n):
+        key, offset = _unpack(data, offset)
+        value, offset = _unpack(data, offset)
+        result[key] = value
+    return result, offset
+
+
+class JsonCodec:
+    """Mevcut protokol; gönderim satır sonu ile, alım HUB_Framing ile çerçevelenir."""
+    name = "json"
+    framing = framing.FRAMING
+
+    def encode(self, obj):
+        return json.dumps(obj).encode()
+
+    def decode(self, payload):
+        return json.loads(payload)
+
+    def frame(self, obj):
+        return self.encode(obj) + b"\n"
+
+
+class BinaryCodec:
+    """Uzunluk önekli msgpack; büyük yükler isteğe bağlı zlib/zstd ile sıkıştırılır.
+
+    Yükün ilk byte'ı sıkıştırma türünü (RAW/ZLIB/ZSTD) belirtir.
+    """
+    framing = "length"
+
+    def __init__(self, compression=None):
+        self.compression = compression
+        self.name = "msgpack" if compression is None else f"msgpack+{compression}"
+        if compression == "zstd" and zstandard is not None:
+            self.zstd_c = zstandard.ZstdCompressor(level=3)
+            self.zstd_d = zstandard.ZstdDecompressor()
+
+    def encode(self, obj):
+        raw = pack(obj)
+        if self.compression is None or len(raw) < COMPRESS_MIN:
+            return bytes((RAW,)) + raw
+        if self.compression == "zstd":
+            return bytes((ZSTD,)) + self.zstd_c.compress(raw)
+        return bytes((ZLIB,)) + zlib.compress(raw, 6)
+
+    def decode(self, payload):
+        """Bozuk yüklerde JsonCodec gibi ValueError yükseltir."""
+        if not payload:
+            raise ValueError("Boş yük")
+        kind, body = payload[0], payload[1:]
+        try:
+            if kind == ZLIB:
+                body = zlib.decompress(body)
+            elif kind == ZSTD and zstandard is not None:
+                body = self.zstd_d.decompress(body)
+            elif kind != RAW:
+                raise ValueError(f"Bilinmeyen sıkıştırma türü: {kind}")
+            return unpack(body)
+        except (zlib.error, IndexError, struct.error) as e:
+            raise ValueError(f"Bozuk {self.name} yükü: {e}") from e
+
+    def frame(self, obj):
+        return framing.encode_length_prefixed(self.encode(obj))
+
+
+def available():
+    """Kurulu codec'ler, tercih sırasına göre."""
+    codecs = []
+    if zstandard is not None:
+        codecs.append(BinaryCodec("zstd"))
+    codecs += [BinaryCodec("zlib"), BinaryCodec(), JsonCodec()]
+    return {codec.name: codec for codec in codecs}
+
+
+def offered(preference=CODECS):
+    """Handshake'te önerilecek codec adları; json her zaman sonda yedek olarak bulunur.
+
+    Codec yanıtı satır olarak geldiğinden uzunluk önekli eski akışta yalnızca json önerilir.
+    msgpack C eklentisi yoksa HUB_Codecs ile açıkça istenmedikçe yalnızca json önerilir.
+    """
+    if framing.FRAMING != "line":
+        return ["json"]
+    if not preference and not NATIVE_MSGPACK:
+        return ["json"]
+    names = list(available())
+    if preference:
+        wanted = [name.strip() for name in preference.split(",")]
+        names = [name for name in wanted if name in names]
+    if "json" not in names:
+        names.append("json")
+    return names
+
+
+def get(name):
+    """Bilinmeyen veya kurulu olmayan codec için JSON'a düşer."""
+    return available().get(name) or JsonCodec()
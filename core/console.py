@@ -0,0 +1,304 @@
+import os
+import sys
+import time
+import queue
+import atexit
+import logging
+import threading
+import itertools
+import traceback
+import dotenv
+from collections import deque
+
+dotenv.load_dotenv()
+
+DEBUG, INFO, WARNING, ERROR = logging.DEBUG, logging.INFO, logging.WARNING, logging.ERROR
+
+LOG_FILE = "hub.log"
+# Varsayılan seviye ve alt sistem bazında seviyeler, örn. Log_Levels = hub=DEBUG,relay=WARNING
+LOG_LEVEL = os.getenv("Log_Level") or "INFO"
+LOG_LEVELS = os.getenv("Log_Levels") or ""
+# GUI konsolunun okuduğu halka tamponundaki satır sayısı.
+BUFFER_SIZE = int(os.getenv("Log_Buffer") or 2000)
+# Yazıcı thread'i yetişemezse kuyrukta bekleyebilecek kayıt sayısı; fazlası düşürülür.
+QUEUE_LIMIT = 10000
+BATCH_SIZE = 256
+
+_STOP = object()
+
+
+def parse_level(value, default=INFO):
+    if isinstance(value, int):
+        return value
+    level = getattr(logging, str(value).strip().upper(), None)
+    return level if isinstance(level, int) else default
+
+
+def parse_levels(spec):
+    """"hub=DEBUG,relay=WARNING" -> {"hub": 10, "relay": 30}"""
+    levels = {}
+    for item in spec.split(","):
+        name, _, level = item.partition("=")
+        if name.strip() and level.strip():
+            levels[name.strip()] = parse_level(level)
+    return levels
+
+
+class Channel:
+    """Bir alt sistemin (hub, relay, health, ...) log kanalı.
+
+    Kapalı seviyedeki çağrı yalnızca bir tamsayı karşılaştırmasıdır; açık
+    seviyede kayıt biçimlendirilmeden kuyruğa atılır ve %-argümanları
+    yazıcı thread'inde birleştirilir. Bu yüzden mesaj f-string ile değil
+    log.debug("... %s", değer) biçiminde verilmeli, argüman olarak sonradan
+    değişebilecek nesneler yerine değerler geçilmelidir.
+    """
+    __slots__ = ("name", "level", "pipeline")
+
+    def __init__(self, name, level, pipeline):
+        self.name = name
+        self.level = level
+        self.pipeline = pipeline
+
+    def isEnabledFor(self, level):
+        return level >= self.level
+
+    def log(self, level, msg, *args, exc_info=None):
+        if level >= self.level:
+            self.pipeline.put((level, self.name, time.time(), msg, args, exc_info))
+
+    def debug(self, msg, *args):
+        if DEBUG >= self.level:
+            self.pipeline.put((DEBUG, self.name, time.time(), msg, args, None))
+
+    def info(self, msg, *args):
+        if INFO >= self.level:
+            self.pipeline.put((INFO, self.name, time.time(), msg, args, None))
+
+    def warning(self, msg, *args):
+        if WARNING >= self.level:
+            self.pipeline.put((WARNING, self.name, time.time(), msg, args, None))
+
+    def error(self, msg, *args):
+        if ERROR >= self.level:
+            self.pipeline.put((ERROR, self.name, time.time(), msg, args, None))
+
+    def exception(self, msg, *args):
+        """except bloğu içinden; traceback satırlara eklenir."""
+        self.log(ERROR, msg, *args, exc_info=sys.exc_info())
+
+
+class Bridge(logging.Handler):
+    """Üçüncü parti kütüphanelerin (asyncio, aiohttp, ...) standart logging
+    kayıtlarını da aynı hatta yönlendirir."""
+
+    def __init__(self, pipeline):
+        super().__init__()
+        self.pipeline = pipeline
+
+    def emit(self, record):
+        self.pipeline.put((record.levelno, record.name, record.created, record.msg, record.args, record.exc_info))
+
+
+class Pipeline:
+    """Log kayıtlarını tek bir thread'de toplu olarak stdout'a, log dosyasına,
+    halka tampona ve abonelere yazar. put() hiçbir zaman beklemez."""
+
+    def __init__(self, path=LOG_FILE, size=BUFFER_SIZE, stream=None):
+        self.path = path
+        self.stream = stream
+        self.queue = queue.SimpleQueue()
+        self.lines = deque(maxlen=size)
+        self.seq = 0
+        self.dropped = 0
+        self.written = 0
+        self.subscribers = []
+        self.lock = threading.Lock()
+        self.thread = None
+
+    def start(self):
+        if self.thread is None:
+            self.thread = threading.Thread(target=self.run, name="console", daemon=True)
+            self.thread.start()
+
+    def put(self, record):
+        if self.queue.qsize() >= QUEUE_LIMIT:
+            self.dropped += 1
+            return
+        self.queue.put(record)
+
+    def run(self):
+        file = open(self.path, "a", encoding="utf-8") if self.path else None
+        try:
+            while True:
+                batch = [self.queue.get()]
+                while len(batch) < BATCH_SIZE:
+                    try:
+                        batch.append(self.queue.get_nowait())
+                    except queue.Empty:
+                        break
+                records = [item for item in batch if isinstance(item, tuple)]
+                if records:
+                    self.write(records, file)
+                for item in batch:
+                    if isinstance(item, threading.Event):
+                        item.set()
+                if _STOP in batch:
+                    return
+        finally:
+            if file:
+                file.close()
+
+    @staticmethod
+    def format(record):
+        """(konsol satırı, dosya satırı) döndürür."""
+        level, name, created, msg, args, exc_info = record
+        try:
+            message = str(msg) % args if args else str(msg)
+        except Exception as e:
+            message = f"{msg!r} {args!r} biçimlendirilemedi: {e!r}"
+        if exc_info:
+            message = f"{message}\n{''.join(traceback.format_exception(*exc_info)).rstrip()}"
+        level_name = logging.getLevelName(level)
+        stamp = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(created))
+        line = f"[{level_name}] [{name.upper()}] {message}"
+        return line, f"{stamp},{int(created * 1000) % 1000:03d} [{level_name}] {name}: {message}\n"
+
+    def write(self, records, file):
+        lines, file_lines = [], []
+        for record in records:
+            line, file_line = self.format(record)
+            lines.append(line)
+            file_lines.append(file_line)
+
+        stream = self.stream or sys.stdout
+        # pythonw ile çalışırken stdout yoktur.
+        if stream is not None:
+            try:
+                stream.write("\n".join(lines) + "\n")
+                stream.flush()
+            except (OSError, ValueError):
+                pass
+        if file:
+            file.writelines(file_lines)
+            file.flush()
+        with self.lock:
+            self.lines.extend(lines)
+            self.seq += len(lines)
+            self.written += len(lines)
+            subscribers = list(self.subscribers)
+        for callback in subscribers:
+            try:
+                callback(lines)
+            except Exception as e:
+                print(f"[ERROR] Konsol abonesi hatası: {e!r}", flush=True)
+
+    def read(self, since=0, limit=None):
+        """since'ten sonraki satırları ve son okunan sıra numarasını döndürür.
+
+        Tampondan taşan satırlar atlanır; GUI dönen sıra numarasıyla bir
+        sonraki çağrıda kaldığı yerden devam eder.
+        """
+        with self.lock:
+            oldest = self.seq - len(self.lines) + 1
+            first = max(since + 1, oldest)
+            count = self.seq - first + 1
+            if limit is not None:
+                count = min(count, limit)
+            if count <= 0:
+                return self.seq, []
+            start = first - oldest
+            return first + count - 1, list(itertools.islice(self.lines, start, start + count))
+
+    def flush(self, timeout=2.0):
+        """Bu ana kadar kuyruğa giren kayıtlar yazılana kadar bekler."""
+        if self.thread is None or not self.thread.is_alive():
+            return False
+        done = threading.Event()
+        self.queue.put(done)
+        return done.wait(timeout)
+
+    def stop(self, timeout=2.0):
+        if self.thread is None:
+            return
+        self.queue.put(_STOP)
+        self.thread.join(timeout)
+        self.thread = None
+
+
+_pipeline = None
+_channels = {}
+_levels = {}
+_default = parse_level(LOG_LEVEL)
+_lock = threading.Lock()
+
+
+def setup(path=LOG_FILE):
+    """Log hattını bir kez kurar; sonraki çağrılar mevcut hattı döndürür."""
+    global _pipeline
+    with _lock:
+        if _pipeline is None:
+            pipeline = Pipeline(path)
+            _levels.update(parse_levels(LOG_LEVELS))
+            logging.getLogger().addHandler(Bridge(pipeline))
+            pipeline.start()
+            atexit.register(pipeline.stop)
+            _pipeline = pipeline
+    return _pipeline
+
+
+def get(name):
+    """Alt sistemin log kanalı; aynı isim için hep aynı kanal döner."""
+    pipeline = setup()
+    with _lock:
+        channel = _channels.get(name)
+        if channel is None:
+            channel = _channels[name] = Channel(name, _levels.get(name, _default), pipeline)
+    return channel
+
+
+def set_level(name, level):
+    """Çalışırken bir alt sistemin seviyesini değiştirir. name None ise varsayılan
+    seviye değişir ve alt sistemlere özel seviyeler sıfırlanır."""
+    global _default
+    level = parse_level(level)
+    with _lock:
+        if name is None:
+            _default = level
+            _levels.clear()
+        else:
+            _levels[name] = level
+        for channel in _channels.values():
+            channel.level = _levels.get(channel.name, _default)
+
+
+def subscribe(callback):
+    """callback(lines) her toplu yazımda log thread'inden çağrılır."""
+    pipeline = setup()
+    with pipeline.lock:
+        pipeline.subscribers.append(callback)
+
+
+def unsubscribe(callback):
+    pipeline = setup()
+    with pipeline.lock:
+        if callback in pipeline.subscribers:
+            pipeline.subscribers.remove(callback)
+
+
+def read(since=0, limit=None):
+    return setup().read(since, limit)
+
+
+def flush(timeout=2.0):
+    return setup().flush(timeout)
+
+
+def stats():
+    pipeline = setup()
+    return {
+        "queued": pipeline.queue.qsize(),
+        "written": pipeline.written,
+        "dropped": pipeline.dropped,
+        "buffered": len(pipeline.lines),
+    }
@@ -0,0 +1,88 @@
+import os
+import time
+import asyncio
+import threading
+import dotenv
+from collections import OrderedDict
+
+dotenv.load_dotenv()
+
+# Listede gösterilen ve HUB'ın özet listede göndermesi istenen alanlar.
+SUMMARY_FIELDS = (
+    "ID", "name", "status", "private", "type", "players", "max_players", "IP", "Port",
+    "ping", "password_required", "language", "mode", "map", "colour", "version",
+)
+# Yalnızca sunucu seçildiğinde gereken ağır alanlar.
+DETAIL_FIELDS = ("description", "rank", "ping_last_1_hours", "banner", "repository", "web")
+DETAIL_CACHE_SIZE = int(os.getenv("Detail_Cache") or 256)
+DETAIL_TTL = float(os.getenv("Detail_TTL") or 60)
+
+
+def summary(server):
+    return {key: server[key] for key in SUMMARY_FIELDS if key in server}
+
+
+def detail(server):
+    """Kayıtta tüm detay alanları varsa onları, yoksa None döndürür."""
+    if all(key in server for key in DETAIL_FIELDS):
+        return {key: server[key] for key in DETAIL_FIELDS}
+    return None
+
+
+class DetailCache:
+    """Sunucu detayları için boyutu sınırlı, TTL'li LRU önbellek.
+
+    get() Tk thread'inden de çağrılabilir; fetch() runtime loop'unda çalışır
+    ve aynı sunucu için eşzamanlı istekleri tek istekte birleştirir.
+    """
+
+    def __init__(self, maxsize=DETAIL_CACHE_SIZE, ttl=DETAIL_TTL):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.entries = OrderedDict()
+        self.inflight = {}
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    def get(self, server_id):
+        with self.lock:
+            entry = self.entries.get(server_id)
+            if entry is None:
+                return None
+            stored_at, value = entry
+            if time.monotonic() - stored_at > self.ttl:
+                del self.entries[server_id]
+                return None
+            self.entries.move_to_end(server_id)
+            return value
+
+    def put(self, server_id, value):
+        with self.lock:
+            self.entries[server_id] = (time.monotonic(), value)
+            self.entries.move_to_end(server_id)
+            while len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+
+    def invalidate(self, server_id):
+        with self.lock:
+            self.entries.pop(server_id, None)
+
+    async def fetch(self, server_id, loader):
+        """Önbellekte yoksa loader() ile yükler; sonuç önbelleğe yazılır."""
+        value = self.get(server_id)
+        if value is not None:
+            self.hits += 1
+            return value
+        self.misses += 1
+        task = self.inflight.get(server_id)
+        if task is None:
+            task = asyncio.ensure_future(loader())
+            self.inflight[server_id] = task
+            task.add_done_callback(lambda _: self.inflight.pop(server_id, None))
+        value = await asyncio.shield(task)
+        self.put(server_id, value)
+        return value
@@ -0,0 +1,101 @@
+import os
+import struct
+import dotenv
+
+dotenv.load_dotenv()
+
+READ_SIZE = 64 * 1024
+# Tek bir çerçevenin tamponda kaplayabileceği en fazla byte.
+MAX_FRAME = int(os.getenv("HUB_Max_Frame") or 64 * 1024 * 1024)
+# "line": satır sonu ile ayrılmış JSON, "length": 4 byte big-endian uzunluk önekli.
+FRAMING = os.getenv("HUB_Framing") or "line"
+
+
+class FrameError(ValueError):
+    """Çerçeve MAX_FRAME sınırını aştı veya bozuk."""
+
+
+class LineDecoder:
+    """Satır sonu ile ayrılmış çerçeveleri parça parça çözer.
+
+    Yeni gelen veride yalnızca daha önce taranmamış kısım aranır, böylece
+    büyük bir mesaj birçok parçada gelse de tampon tekrar taranmaz.
+    """
+
+    def __init__(self, max_frame=MAX_FRAME):
+        self.max_frame = max_frame
+        self.buffer = bytearray()
+        self.scanned = 0
+
+    def reset(self):
+        self.buffer.clear()
+        self.scanned = 0
+
+    def feed(self, data):
+        """data'yı tampona ekler, tamamlanan çerçeveleri (bytes) döndürür."""
+        buffer = self.buffer
+        buffer += data
+        frames = []
+        start = 0
+        pos = self.scanned
+        while (end := buffer.find(b"\n", pos)) >= 0:
+            frame = bytes(buffer[start:end]).rstrip(b"\r")
+            if frame:
+                frames.append(frame)
+            start = pos = end + 1
+        if start:
+            del buffer[:start]
+        self.scanned = len(buffer)
+        if self.scanned > self.max_frame:
+            self.reset()
+            raise FrameError(f"Çerçeve {self.max_frame} byte sınırını aştı")
+        return frames
+
+
+class LengthPrefixedDecoder:
+    """4 byte big-endian uzunluk önekli çerçeveleri parça parça çözer."""
+
+    HEADER = struct.Struct(">I")
+
+    def __init__(self, max_frame=MAX_FRAME):
+        self.max_frame = max_frame
+        self.buffer = bytearray()
+        self.expected = None
+
+    def reset(self):
+        self.buffer.clear()
+        self.expected = None
+
+    def feed(self, data):
+        buffer = self.buffer
+        buffer += data
+        frames = []
+        offset = 0
+        size = self.HEADER.size
+        while True:
+            if self.expected is None:
+                if len(buffer) - offset < size:
+                    break
+                self.expected = self.HEADER.unpack_from(buffer, offset)[0]
+                offset += size
+                if self.expected > self.max_frame:
+                    self.reset()
+                    raise FrameError(f"Çerçeve {self.max_frame} byte sınırını aştı")
+            if len(buffer) - offset < self.expected:
+                break
+            frames.append(bytes(buffer[offset:offset + self.expected]))
+            offset += self.expected
+            self.expected = None
+        if offset:
+            del buffer[:offset]
+        return frames
+
+
+def encode_length_prefixed(payload):
+    return LengthPrefixedDecoder.HEADER.pack(len(payload)) + payload
+
+
+def make_decoder(framing=FRAMING, max_frame=MAX_FRAME):
+    if framing == "length":
+        return LengthPrefixedDecoder(max_frame)
+    return LineDecoder(max_frame)
@@ -0,0 +1,222 @@
+import os
+import re
+import math
+import mmap
+import time
+import struct
+import dotenv
+from array import array
+from utils.helper import get_resource_path
+
+dotenv.load_dotenv()
+
+HISTORY_DIR = os.getenv("History_Dir") or get_resource_path("..", "data", "history")
+# Dosya başına tutulan süre (saniye); kapasite bu süre / örnekleme aralığıdır.
+HISTORY_SECONDS = float(os.getenv("History_Seconds") or 3600)
+
+# Dosya düzeni: HEADER_SIZE baytlık başlık, ardından kapasite kadar float32
+# gecikme (ms, yanıt yoksa NaN) ve kapasite kadar uint8 bayrak sütunu.
+# Sütunlar yerel bayt sırasıyla yazılır; desteklenen tüm platformlar little-endian.
+MAGIC = b"SRHT"
+VERSION = 1
+# magic, sürüm, başlık boyu, aralık, kapasite, boş, yazılan slot sayısı, son slotun zamanı
+HEADER = struct.Struct("<4sHHdIIQd")
+HEADER_SIZE = 64
+# Bayraklar; 0 olan slot o aralıkta örnek alınmadığını (uygulama kapalı) gösterir.
+SAMPLED = 1
+UP = 2
+PROBED = 4
+
+
+def file_size(capacity):
+    return HEADER_SIZE + 5 * capacity
+
+
+def server_path(server_id, directory=None):
+    name = re.sub(r"[^\w.-]", "_", str(server_id))
+    return os.path.join(directory or HISTORY_DIR, f"{name}.bin")
+
+
+def read_header(buffer):
+    """(aralık, kapasite, yazılan slot, son zaman) ya da düzen tanınmıyorsa None."""
+    if len(buffer) < HEADER_SIZE:
+        return None
+    magic, version, header_size, interval, capacity, _, total, updated = HEADER.unpack_from(buffer)
+    if magic != MAGIC or version != VERSION or header_size != HEADER_SIZE or len(buffer) != file_size(capacity):
+        return None
+    return interval, capacity, total, updated
+
+
+def columns(buffer, capacity):
+    """Gecikme ve bayrak sütunlarının kopyasız görünümleri."""
+    view = memoryview(buffer)
+    latency = view[HEADER_SIZE:HEADER_SIZE + 4 * capacity].cast("f")
+    flags = view[HEADER_SIZE + 4 * capacity:file_size(capacity)]
+    return latency, flags
+
+
+def ordered(column, total, capacity, typecode):
+    """Halka sütunu eskiden yeniye sıralı bir array olarak kopyalar."""
+    head = total % capacity
+    if total < capacity:
+        return array(typecode, column[:head])
+    result = array(typecode, column[head:])
+    result.extend(column[:head])
+    return result
+
+
+class HistoryFile:
+    """Tek sunucunun sağlık örnekleri için sabit boyutlu, bellek eşlemeli halka dosya.
+
+    Her örnekleme aralığına bir slot düşer; uygulama kapalıyken geçen
+    aralıklar açılışta boş slot olarak atlanır, böylece slotlar zamana
+    hizalı kalır. Başlıktaki aralık ya da kapasite değişmişse dosya baştan
+    oluşturulur. Yazımlar doğrudan eşlenmiş belleğe yapılır; flush() diske
+    eşitlemeyi hızlandırır, ama işlem kapanınca da veriyi işletim sistemi yazar.
+    """
+
+    def __init__(self, path, interval=1.0, capacity=None):
+        self.path = path
+        self.interval = interval
+        self.capacity = capacity or max(1, round(HISTORY_SECONDS / interval))
+        self.total = 0
+        self.updated = 0.0
+        self.map = None
+        self.latency = None
+        self.flags = None
+        self.open()
+
+    def open(self):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        size = file_size(self.capacity)
+        with open(self.path, "r+b" if os.path.exists(self.path) else "w+b") as f:
+            header = read_header(f.read(size))
+            if header is None or header[:2] != (self.interval, self.capacity):
+                f.seek(0)
+                f.truncate()
+                f.write(bytes(size))
+                f.flush()
+                header = None
+            self.map = mmap.mmap(f.fileno(), size)
+        if header is None:
+            self.latency, self.flags = columns(self.map, self.capacity)
+            for i in range(self.capacity):
+                self.latency[i] = math.nan
+            self.write_header()
+        else:
+            _, _, self.total, self.updated = header
+            self.latency, self.flags = columns(self.map, self.capacity)
+
+    def write_header(self):
+        HEADER.pack_into(self.map, 0, MAGIC, VERSION, HEADER_SIZE, self.interval, self.capacity, 0,
+                         self.total, self.updated)
+
+    def put(self, flags, latency):
+        slot = self.total % self.capacity
+        self.latency[slot] = latency
+        self.flags[slot] = flags
+        self.total += 1
+
+    def append(self, status, latency=None, timestamp=None):
+        """MeasureStore.add ile aynı anlam: latency None ise ping atılmamış, inf/NaN ise kayıp."""
+        timestamp = timestamp or time.time()
+        if self.updated:
+            missed = round((timestamp - self.updated) / self.interval) - 1
+            for _ in range(min(max(missed, 0), self.capacity)):
+                self.put(0, math.nan)
+        flags = SAMPLED | (UP if status else 0)
+        if latency is not None:
+            flags |= PROBED
+        answered = latency is not None and math.isfinite(latency)
+        self.put(flags, latency if answered else math.nan)
+        self.updated = timestamp
+        self.write_header()
+
+    def samples(self):
+        """Kayıtlı örnekler eskiden yeniye (zaman, durum, gecikme); gecikme MeasureStore.add biçiminde."""
+        count = min(self.total, self.capacity)
+        flags = ordered(self.flags, self.total, self.capacity, "B")
+        latency = ordered(self.latency, self.total, self.capacity, "f")
+        start = self.updated - (count - 1) * self.interval
+        for i in range(count):
+            if not flags[i] & SAMPLED:
+                continue
+            if not flags[i] & PROBED:
+                value = None
+            elif math.isnan(latency[i]):
+                value = math.inf
+            else:
+                value = latency[i]
+            yield start + i * self.interval, bool(flags[i] & UP), value
+
+    def series(self):
+        """Gecikme sütunu eskiden yeniye; yanıt olmayan slotlar NaN."""
+        return ordered(self.latency, self.total, self.capacity, "f")
+
+    def flush(self):
+        if self.map is not None:
+            self.map.flush()
+
+    def close(self):
+        if self.map is None:
+            return
+        # mmap, üzerinde açık görünüm varken kapatılamaz.
+        self.latency.release()
+        self.flags.release()
+        self.map.close()
+        self.map = self.latency = self.flags = None
+
+
+def open_server(server_id, interval=1.0):
+    return HistoryFile(server_path(server_id), interval)
+
+
+def read(server_id, directory=None):
+    """(aralık, gecikme serisi) ya da dosya yoksa None; seri eskiden yeniye, boşluklar NaN.
+
+    Dosya yazılırken de okunabilir; sütun ayrıştırılmadan kopyalanır.
+    """
+    path = server_path(server_id, directory)
+    try:
+        with open(path, "rb") as f:
+            buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        return None
+    try:
+        header = read_header(buffer)
+        if header is None:
+            return None
+        interval, capacity, total, _ = header
+        latency, flags = columns(buffer, capacity)
+        try:
+            return interval, ordered(latency, total, capacity, "f")
+        finally:
+            latency.release()
+            flags.release()
+    finally:
+        buffer.close()
+
+
+def read_series(server_id, directory=None):
+    """Sunucunun kayıtlı gecikme serisi (ms, eskiden yeniye, boşluklar NaN); dosya yoksa None."""
+    result = read(server_id, directory)
+    return result[1] if result else None
+
+
+def read_averages(server_id, step=60, directory=None):
+    """Kayıtlı gecikmenin step saniyelik dilimlerdeki ortalamaları (ms, eskiden yeniye).
+
+    Ping her slotta atılmadığından ham seride yanıtlar NaN'larla ayrıktır;
+    yanıt içermeyen dilimler atlanır. Dosya yoksa None.
+    """
+    result = read(server_id, directory)
+    if result is None:
+        return None
+    interval, series = result
+    size = max(1, round(step / interval))
+    averages = []
+    for start in range(0, len(series), size):
+        answered = [value for value in series[start:start + size] if not math.isnan(value)]
+        if answered:
+            averages.append(sum(answered) / len(answered))
+    return averages
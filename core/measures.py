@@ -0,0 +1,188 @@
+import math
+import time
+from array import array
+
+# Aynı anda tutulan pencereler (saniye).
+WINDOWS = {"1m": 60, "5m": 300, "1h": 3600}
+# Kayan toplamlar bu kadar örnekte bir baştan hesaplanır; float hatası birikmesin.
+RESUM_EVERY = 4096
+# Gecikme histogramı: LATENCY_MIN ms'den başlayıp her kovada BUCKET_GROWTH katı büyüyen
+# logaritmik kovalar; yüzdelik değerlerin göreli hatası en fazla ~%2.5'tir.
+LATENCY_MIN = 0.1
+LATENCY_MAX = 60000.0
+BUCKET_GROWTH = 1.05
+_LOG_GROWTH = math.log(BUCKET_GROWTH)
+BUCKETS = int(math.log(LATENCY_MAX / LATENCY_MIN) / _LOG_GROWTH) + 2
+NO_BUCKET = 0xFFFF
+QUANTILES = {"ping_p50": 0.50, "ping_p95": 0.95, "ping_p99": 0.99}
+
+
+def bucket(latency):
+    if latency <= LATENCY_MIN:
+        return 0
+    return min(BUCKETS - 1, int(math.log(latency / LATENCY_MIN) / _LOG_GROWTH) + 1)
+
+
+def bucket_value(index):
+    """Kovanın temsil değeri (sınırlarının geometrik ortası)."""
+    if index == 0:
+        return LATENCY_MIN
+    return LATENCY_MIN * BUCKET_GROWTH ** (index - 0.5)
+
+
+class Window:
+    """Son size örneğin kayan toplamları ve gecikme histogramı."""
+    __slots__ = ("size", "count", "sampled", "up", "probes", "lost", "latency_sum", "jitter_sum", "jitter_count", "buckets")
+
+    def __init__(self, size):
+        self.size = size
+        self.count = 0
+        self.sampled = 0
+        self.up = 0
+        self.probes = 0
+        self.lost = 0
+        self.latency_sum = 0.0
+        self.jitter_sum = 0.0
+        self.jitter_count = 0
+        self.buckets = array("I", bytes(4 * BUCKETS))
+
+    def quantiles(self):
+        """QUANTILES yüzdeliklerini histogramın tek geçişiyle bulur; yanıt yoksa None."""
+        answered = self.probes - self.lost
+        if not answered:
+            return dict.fromkeys(QUANTILES)
+        targets = sorted((q * (answered - 1), name) for name, q in QUANTILES.items())
+        result = {}
+        seen = 0
+        for index, count in enumerate(self.buckets):
+            seen += count
+            while targets and seen > targets[0][0]:
+                result[targets.pop(0)[1]] = round(bucket_value(index), 2)
+            if not targets:
+                break
+        return result
+
+    def summary(self):
+        answered = self.probes - self.lost
+        data = {
+            "samples": self.sampled,
+            "status": self.up / self.sampled if self.sampled else 0,
+            # Hiç yanıt yoksa ortalama yoktur; kayıplar loss_rate'te görünür.
+            "ping_latency": self.latency_sum / answered if answered else None,
+            "packet_loss_count": self.lost,
+            "loss_rate": self.lost / self.probes if self.probes else 0,
+            "jitter": self.jitter_sum / self.jitter_count if self.jitter_count else None,
+        }
+        data.update(self.quantiles())
+        return data
+
+
+class MeasureStore:
+    """Sabit aralıklı sağlık örnekleri için halka tampon.
+
+    Örnekler array'lerde tutulur; her pencere için toplamlar ve gecikme
+    histogramı örnek eklenirken güncellenir, pencereden çıkan örnek
+    histogramdan geri düşülür. Böylece add() pencere boyundan bağımsızdır.
+    Kayıp (yanıtsız) ping'ler gecikme ortalamasına ve yüzdeliklere katılmaz,
+    kayıp sayısına ve oranına yazılır. Ping atılamayan (bağlantı yok)
+    örnekler yalnızca durum oranına girer. Jitter, art arda yanıtlanan iki
+    ping arasındaki mutlak farkların ortalamasıdır. skip() ile işlenen boş
+    aralıklar (uygulama kapalıyken geçen süre) pencerede yer kaplar ama
+    hiçbir orana girmez; böylece eski örnekler pencereden zamanında çıkar.
+    """
+
+    def __init__(self, interval=1.0, windows=WINDOWS):
+        self.interval = interval
+        self.windows = {name: Window(max(1, round(seconds / interval))) for name, seconds in windows.items()}
+        self.capacity = max(window.size for window in self.windows.values())
+        self.latency = array("d", bytes(8 * self.capacity))
+        self.jitter = array("d", bytes(8 * self.capacity))
+        self.bucket = array("H", [NO_BUCKET]) * self.capacity
+        self.up = array("B", bytes(self.capacity))
+        self.sampled = array("B", bytes(self.capacity))
+        self.probed = array("B", bytes(self.capacity))
+        self.lost = array("B", bytes(self.capacity))
+        self.head = 0
+        self.total = 0
+        self.timestamp = 0
+        self.previous = None
+
+    def add(self, status, latency=None, timestamp=None, sampled=True):
+        """latency milisaniye; inf veya NaN ise ping kayıp, None ise ping atılmamış sayılır."""
+        sampled = 1 if sampled else 0
+        probed = sampled and latency is not None
+        lost = probed and not math.isfinite(latency)
+        answered = probed and not lost
+        latency = float(latency) if answered else 0.0
+        index = bucket(latency) if answered else NO_BUCKET
+        jitter, jittered = 0.0, False
+        if answered:
+            if self.previous is not None:
+                jitter, jittered = abs(latency - self.previous), True
+            self.previous = latency
+        up = 1 if status and sampled else 0
+        head = self.head
+        for window in self.windows.values():
+            if window.count == window.size:
+                old = (head - window.size) % self.capacity
+                window.sampled -= self.sampled[old]
+                window.up -= self.up[old]
+                window.probes -= self.probed[old]
+                window.lost -= self.lost[old]
+                window.latency_sum -= self.latency[old]
+                if self.bucket[old] != NO_BUCKET:
+                    window.buckets[self.bucket[old]] -= 1
+                    # İlk yanıtın jitter'ı yoktur; yalnızca jitter'ı olan örnek düşülür.
+                    if self.jitter[old] >= 0:
+                        window.jitter_sum -= self.jitter[old]
+                        window.jitter_count -= 1
+            else:
+                window.count += 1
+            window.sampled += sampled
+            window.up += up
+            window.probes += probed
+            window.lost += lost
+            window.latency_sum += latency
+            if answered:
+                window.buckets[index] += 1
+                if jittered:
+                    window.jitter_sum += jitter
+                    window.jitter_count += 1
+        self.latency[head] = latency
+        self.jitter[head] = jitter if jittered else -1.0
+        self.bucket[head] = index
+        self.up[head] = up
+        self.sampled[head] = sampled
+        self.probed[head] = probed
+        self.lost[head] = lost
+        self.head = (head + 1) % self.capacity
+        self.total += 1
+        self.timestamp = timestamp or time.time()
+        if self.total % RESUM_EVERY == 0:
+            self.resum()
+
+    def skip(self, count, timestamp=None):
+        """count aralık boyunca örnek alınmadığını işler (en fazla kapasite kadar)."""
+        if count <= 0:
+            return
+        # Boşluğun iki yanındaki pingler arasındaki fark jitter sayılmaz.
+        self.previous = None
+        for _ in range(min(count, self.capacity)):
+            self.add(False, None, timestamp, sampled=False)
+
+    def resum(self):
+        for window in self.windows.values():
+            indexes = [(self.head - i) % self.capacity for i in range(1, window.count + 1)]
+            window.latency_sum = math.fsum(self.latency[i] for i in indexes)
+            window.jitter_sum = math.fsum(self.jitter[i] for i in indexes if self.jitter[i] >= 0)
+
+    def summary(self, name):
+        data = self.windows[name].summary()
+        data["timestamp"] = self.timestamp
+        return data
+
+    def report(self, primary="5m"):
+        """primary penceresinin özeti ve tüm pencerelerin özetleri (HUB'a giden paket)."""
+        data = self.summary(primary)
+        data["windows"] = {name: window.summary() for name, window in self.windows.items()}
+        return data
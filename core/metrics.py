@@ -0,0 +1,150 @@
+import os
+import json
+import time
+import asyncio
+import itertools
+import dotenv
+from collections import deque
+
+from core import console
+from core.relay import ByteCounter
+
+dotenv.load_dotenv()
+
+log = console.get("relay")
+
+# 0 ise istatistik uç noktası kapalıdır.
+STATS_PORT = int(os.getenv("Stats_Port") or 0)
+STATS_HOST = "127.0.0.1"
+
+
+class SessionStats:
+    __slots__ = ("id", "client", "upstream", "started", "connect_ms", "up", "down", "ended", "error", "rtt")
+
+    def __init__(self, session_id, client):
+        self.id = session_id
+        self.client = client
+        self.upstream = None
+        self.started = time.time()
+        self.connect_ms = None
+        self.up = ByteCounter()
+        self.down = ByteCounter()
+        self.ended = None
+        self.error = None
+        self.rtt = None
+
+    def as_dict(self):
+        end = self.ended or time.time()
+        return {
+            "id": self.id,
+            "client": self.client,
+            "upstream": self.upstream,
+            "connect_ms": round(self.connect_ms, 2) if self.connect_ms is not None else None,
+            "bytes_up": self.up.value,
+            "bytes_down": self.down.value,
+            "duration": round(end - self.started, 2),
+            "rtt_ms": round(self.rtt.last, 2) if self.rtt and self.rtt.last is not None else None,
+            "error": self.error,
+        }
+
+
+class GatewayMetrics:
+    """Bir Gateway'in oturum ve toplam sayaçları."""
+
+    def __init__(self, history=50):
+        self.ids = itertools.count(1)
+        self.active = {}
+        self.recent = deque(maxlen=history)
+        self.sessions = 0
+        self.failed_connects = 0
+        self.relay_errors = 0
+        self.closed_up = 0
+        self.closed_down = 0
+        self.connect_total_ms = 0.0
+        self.connected = 0
+
+    def open(self, client):
+        session = SessionStats(next(self.ids), client)
+        self.active[session.id] = session
+        self.sessions += 1
+        return session
+
+    def upstream_connected(self, session, upstream, connect_ms):
+        session.upstream = upstream
+        session.connect_ms = connect_ms
+        self.connected += 1
+        self.connect_total_ms += connect_ms
+
+    def close(self, session, error=None):
+        if self.active.pop(session.id, None) is None:
+            return
+        session.ended = time.time()
+        if error is not None:
+            session.error = error
+            if session.upstream is None:
+                self.failed_connects += 1
+            else:
+                self.relay_errors += 1
+        self.closed_up += session.up.value
+        self.closed_down += session.down.value
+        self.recent.append(session)
+
+    def totals(self):
+        """Sadece sayısal toplamlar; worker'lar arasında toplanabilir."""
+        active = list(self.active.values())
+        return {
+            "connections": len(active),
+            "sessions": self.sessions,
+            "failed_connects": self.failed_connects,
+            "relay_errors": self.relay_errors,
+            "bytes_up": self.closed_up + sum(s.up.value for s in active),
+            "bytes_down": self.closed_down + sum(s.down.value for s in active),
+            "connect_ms_total": round(self.connect_total_ms, 2),
+            "connected": self.connected,
+        }
+
+    def snapshot(self):
+        data = self.totals()
+        data["connect_ms_avg"] = round(self.connect_total_ms / self.connected, 2) if self.connected else None
+        data["active"] = [s.as_dict() for s in list(self.active.values())]
+        data["recent"] = [s.as_dict() for s in list(self.recent)]
+        return data
+
+
+class StatsServer:
+    """snapshot() çıktısını JSON olarak sunan salt okunur yerel HTTP uç noktası."""
+
+    def __init__(self, snapshot, host=STATS_HOST, port=STATS_PORT):
+        self.snapshot = snapshot
+        self.host = host
+        self.port = port
+        self.server = None
+
+    async def handle(self, reader, writer):
+        try:
+            request = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), timeout=5)
+            method = request.split(b" ", 1)[0]
+            if method != b"GET":
+                status, body = "405 Method Not Allowed", b'{"error": "read-only"}'
+            else:
+                status, body = "200 OK", json.dumps(self.snapshot()).encode()
+            writer.write(
+                f"HTTP/1.1 {status}\r\nContent-Type: application/json\r\n"
+                f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode() + body
+            )
+            await writer.drain()
+        except (asyncio.TimeoutError, asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    async def start(self):
+        self.server = await asyncio.start_server(self.handle, self.host, self.port)
+        self.port = self.server.sockets[0].getsockname()[1]
+        log.info("İstatistikler http://%s:%s/ adresinde yayında", self.host, self.port)
+
+    async def stop(self):
+        if self.server:
+            self.server.close()
+            await self.server.wait_closed()
+            self.server = None
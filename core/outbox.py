@@ -0,0 +1,172 @@
+import os
+import asyncio
+import concurrent.futures
+import dotenv
+from core import console
+
+dotenv.load_dotenv()
+
+log = console.get("hub")
+
+# Kuyruk dolunca async gönderenler bekler, send() çağrıları QueueFull ile reddedilir.
+QUEUE_SIZE = int(os.getenv("HUB_Send_Queue") or 256)
+# Tek write() çağrısında birleştirilecek en fazla paket.
+BATCH_SIZE = 64
+WRITE_TIMEOUT = 5
+# Aynı partide birden fazlası varsa yalnızca sonuncusu gönderilen mesaj türleri.
+COALESCE = {"Heartbeat", "info"}
+
+
+class NotConnected(ConnectionError):
+    """HUB bağlantısı WRITE_TIMEOUT içinde hazır olmadı."""
+
+
+class SendQueue:
+    """HUB'a giden paketleri tek bir yazıcı coroutine üzerinden gönderir.
+
+    Kuyrukta bekleyen paketler tek bir write() + drain() ile gönderilir;
+    heartbeat/info gibi durum mesajlarının eski kopyaları atlanır. Her paket
+    gönderildiğinde (veya başarısız olduğunda) sonuçlanan bir future ile
+    kuyruğa girer. Bağlantıyı yalnızca denetlenen HUB oturumu kurar; yazıcı
+    bağlantı yokken bir süre hazır olmasını bekler, olmazsa paketleri
+    NotConnected ile reddeder.
+    """
+
+    def __init__(self, hub, maxsize=QUEUE_SIZE, batch_size=BATCH_SIZE):
+        self.hub = hub
+        self.maxsize = maxsize
+        self.batch_size = batch_size
+        self.loop = None
+        self.queue = None
+        self.task = None
+        self.sent = 0
+        self.coalesced = 0
+        self.rejected = 0
+
+    def start(self):
+        """Çalışan loop üzerinde yazıcıyı başlatır."""
+        if self.task and not self.task.done():
+            return
+        self.loop = asyncio.get_running_loop()
+        if self.queue is None:
+            self.queue = asyncio.Queue(self.maxsize)
+        self.task = self.loop.create_task(self.run())
+
+    async def stop(self):
+        if self.task:
+            self.task.cancel()
+            await asyncio.gather(self.task, return_exceptions=True)
+            self.task = None
+        while self.queue and not self.queue.empty():
+            _, future = self.queue.get_nowait()
+            fail(future, ConnectionError("Gönderim kuyruğu kapatıldı"))
+
+    async def put(self, package):
+        """Kuyruk doluysa yer açılana kadar bekler; gönderim sonucunu bekleyen future döndürür."""
+        future = self.loop.create_future()
+        await self.queue.put((package, future))
+        return future
+
+    def send(self, package):
+        """Herhangi bir thread'den engellemeden kuyruğa ekler.
+
+        concurrent.futures.Future döndürür; sonucu beklemek isteyen çağıran
+        future.result() veya asyncio.wrap_future() kullanabilir. Kuyruk doluysa
+        future asyncio.QueueFull ile sonuçlanır.
+        """
+        future = concurrent.futures.Future()
+        if self.loop is None or self.loop.is_closed():
+            future.set_exception(RuntimeError("Event loop henüz ayarlanmadı"))
+        elif running_loop() is self.loop:
+            self.enqueue(package, future)
+        else:
+            self.loop.call_soon_threadsafe(self.enqueue, package, future)
+        return future
+
+    def enqueue(self, package, future):
+        try:
+            self.queue.put_nowait((package, future))
+        except asyncio.QueueFull:
+            self.rejected += 1
+            fail(future, asyncio.QueueFull(f"Gönderim kuyruğu dolu ({self.maxsize})"))
+
+    def collect(self, first):
+        batch = [first]
+        while len(batch) < self.batch_size and not self.queue.empty():
+            batch.append(self.queue.get_nowait())
+        latest = {}
+        for index, (package, _) in enumerate(batch):
+            msg_type = package["data"].get("type")
+            if msg_type in COALESCE:
+                latest[msg_type] = index
+        packages, futures = [], []
+        for index, (package, future) in enumerate(batch):
+            msg_type = package["data"].get("type")
+            if msg_type in COALESCE and latest[msg_type] != index:
+                self.coalesced += 1
+                futures.append(future)
+                continue
+            packages.append(package)
+            futures.append(future)
+        return packages, futures
+
+    async def run(self):
+        hub = self.hub
+        while True:
+            packages, futures = self.collect(await self.queue.get())
+            try:
+                if not hub.check_connection():
+                    await self.wait_connected()
+                data = b"".join(hub.codec.frame(package) for package in packages)
+                hub.writer.write(data)
+                await asyncio.wait_for(hub.writer.drain(), timeout=WRITE_TIMEOUT)
+            except asyncio.CancelledError:
+                for future in futures:
+                    fail(future, ConnectionError("Gönderim kuyruğu kapatıldı"))
+                raise
+            except NotConnected as e:
+                log.warning("%s (%d paket gönderilmedi)", e, len(packages))
+                for future in futures:
+                    fail(future, e)
+                continue
+            except Exception as e:
+                log.error("Veri yazma hatası: %s (%d paket)", e, len(packages))
+                hub.drop_connection()
+                for future in futures:
+                    fail(future, e)
+                continue
+            self.sent += len(packages)
+            for future in futures:
+                if not future.done():
+                    future.set_result(True)
+            if log.isEnabledFor(console.DEBUG):
+                types = ", ".join(str(package["data"].get("type")) for package in packages)
+                log.debug("Veri gönderildi: %s (%d byte)", types, len(data))
+
+    async def wait_connected(self):
+        try:
+            await asyncio.wait_for(self.hub.ready.wait(), timeout=WRITE_TIMEOUT)
+        except asyncio.TimeoutError:
+            raise NotConnected("HUB bağlantısı yok") from None
+        if not self.hub.check_connection():
+            raise NotConnected("HUB bağlantısı yok")
+
+    def stats(self):
+        return {
+            "queued": self.queue.qsize() if self.queue else 0,
+            "sent": self.sent,
+            "coalesced": self.coalesced,
+            "rejected": self.rejected,
+        }
+
+
+def running_loop():
+    try:
+        return asyncio.get_running_loop()
+    except RuntimeError:
+        return None
+
+
+def fail(future, exc):
+    if not future.done():
+        future.set_exception(exc)
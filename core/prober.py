@@ -0,0 +1,182 @@
+import os
+import time
+import random
+import socket
+import struct
+import asyncio
+import dotenv
+
+dotenv.load_dotenv()
+
+# auto: ICMP açılabiliyorsa ICMP, açılamıyorsa ya da hedef ICMP'ye yanıt vermiyorsa TCP bağlantı süresi.
+PROBE_METHOD = (os.getenv("Probe_Method") or "auto").lower()
+PROBE_TIMEOUT = float(os.getenv("Probe_Timeout") or 2)
+# Aynı anda en fazla bu kadar ölçüm; saniyede en fazla Probe_Rate yeni ölçüm başlar.
+PROBE_CONCURRENCY = int(os.getenv("Probe_Concurrency") or 32)
+PROBE_RATE = float(os.getenv("Probe_Rate") or 100)
+
+ICMP_ECHO_REQUEST = 8
+ICMP_ECHO_REPLY = 0
+PAYLOAD = b"sro-sb-probe"
+
+
+def checksum(data):
+    if len(data) % 2:
+        data += b"\0"
+    total = sum(struct.unpack(f"!{len(data) // 2}H", data))
+    total = (total >> 16) + (total & 0xFFFF)
+    total += total >> 16
+    return ~total & 0xFFFF
+
+
+def echo_request(ident, seq):
+    header = struct.pack("!BBHHH", ICMP_ECHO_REQUEST, 0, 0, ident, seq)
+    return struct.pack("!BBHHH", ICMP_ECHO_REQUEST, 0, checksum(header + PAYLOAD), ident, seq) + PAYLOAD
+
+
+def parse_reply(data):
+    """(type, ident, seq) döndürür; ham soketlerde ve macOS'ta başta IP başlığı bulunur."""
+    if len(data) >= 20 and data[0] >> 4 == 4:
+        data = data[(data[0] & 0x0F) * 4:]
+    if len(data) < 8:
+        return None
+    icmp_type, _, _, ident, seq = struct.unpack("!BBHHH", data[:8])
+    return icmp_type, ident, seq
+
+
+def open_icmp_socket():
+    """Yetkisiz ICMP datagram soketi (Linux ping_group_range, macOS), olmazsa ham soket (yönetici/root).
+
+    (soket, ham_mı) döndürür; ikisi de açılamazsa OSError yükseltir.
+    """
+    try:
+        return socket.socket(socket.AF_INET, socket.SOCK_DGRAM, socket.IPPROTO_ICMP), False
+    except OSError:
+        return socket.socket(socket.AF_INET, socket.SOCK_RAW, socket.IPPROTO_ICMP), True
+
+
+class Prober:
+    """Event loop'u hiç engellemeden çok sayıda hedefin gecikmesini ölçer.
+
+    Ölçümler milisaniye döner, yanıt alınamazsa None. Eşzamanlılık ve
+    başlatma hızı sınırlıdır. Semaphore ilk kullanıldığı loop'a bağlandığından
+    her event loop kendi Prober'ını kullanmalıdır.
+    """
+
+    def __init__(self, method=PROBE_METHOD, timeout=PROBE_TIMEOUT,
+                 concurrency=PROBE_CONCURRENCY, rate=PROBE_RATE):
+        self.method = method
+        self.timeout = timeout
+        self.semaphore = asyncio.Semaphore(concurrency)
+        self.interval = 1 / rate if rate > 0 else 0
+        self.next_start = 0.0
+        # None: henüz denenmedi.
+        self.icmp_available = None if method != "tcp" else False
+        # ICMP'ye yanıt vermeyen ama TCP ile ulaşılan hedefler.
+        self.icmp_blocked = set()
+        self.seq = random.randrange(0x10000)
+        self.sent = 0
+        self.lost = 0
+
+    async def throttle(self):
+        if not self.interval:
+            return
+        now = time.monotonic()
+        start = max(now, self.next_start)
+        self.next_start = start + self.interval
+        if start > now:
+            await asyncio.sleep(start - now)
+
+    async def resolve(self, host):
+        loop = asyncio.get_running_loop()
+        infos = await loop.getaddrinfo(host, None, family=socket.AF_INET, type=socket.SOCK_STREAM)
+        return infos[0][4][0]
+
+    async def probe(self, host, port=None):
+        """host'un gecikmesi (ms) ya da None."""
+        async with self.semaphore:
+            await self.throttle()
+            self.sent += 1
+            try:
+                address = await asyncio.wait_for(self.resolve(host), self.timeout)
+            except (OSError, asyncio.TimeoutError):
+                self.lost += 1
+                return None
+            rtt = None
+            if self.icmp_available is not False and address not in self.icmp_blocked:
+                rtt = await self.icmp(address)
+            if rtt is None and port and self.method != "icmp":
+                rtt = await self.tcp(address, port)
+                if rtt is not None and self.icmp_available:
+                    self.icmp_blocked.add(address)
+            if rtt is None:
+                self.lost += 1
+            return rtt
+
+    async def icmp(self, address):
+        try:
+            sock, raw = open_icmp_socket()
+        except OSError:
+            self.icmp_available = False
+            return None
+        self.icmp_available = True
+        loop = asyncio.get_running_loop()
+        self.seq = (self.seq + 1) & 0xFFFF
+        seq = self.seq
+        # Datagram soketlerinde kimliği çekirdek atar ve yanıtları sokete göre ayırır.
+        ident = random.randrange(0x10000)
+        try:
+            sock.setblocking(False)
+            start = time.perf_counter()
+            sock.sendto(echo_request(ident, seq), (address, 0))
+            deadline = start + self.timeout
+            while True:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    return None
+                data = await asyncio.wait_for(loop.sock_recv(sock, 1024), remaining)
+                reply = parse_reply(data)
+                if reply and reply[0] == ICMP_ECHO_REPLY and reply[2] == seq and (not raw or reply[1] == ident):
+                    return (time.perf_counter() - start) * 1000
+        except (OSError, asyncio.TimeoutError):
+            return None
+        finally:
+            sock.close()
+
+    async def tcp(self, address, port):
+        """TCP bağlantı kurulum süresi. Bağlantı reddi (RST) de bir tam tur olduğundan ölçüm sayılır."""
+        loop = asyncio.get_running_loop()
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        sock.setblocking(False)
+        start = time.perf_counter()
+        try:
+            await asyncio.wait_for(loop.sock_connect(sock, (address, port)), self.timeout)
+        except ConnectionRefusedError:
+            pass
+        except (OSError, asyncio.TimeoutError):
+            return None
+        finally:
+            sock.close()
+        return (time.perf_counter() - start) * 1000
+
+    async def probe_many(self, targets):
+        """[(host, port), ...] hedeflerini eşzamanlı ölçer; {(host, port): ms ya da None}."""
+        targets = list(dict.fromkeys(targets))
+        results = await asyncio.gather(*(self.probe(host, port) for host, port in targets))
+        return dict(zip(targets, results))
+
+    async def average(self, hosts, port=None):
+        """Yanıt veren hostların ortalama gecikmesi (ms, 2 basamak); hiçbiri yanıt vermezse None."""
+        if isinstance(hosts, str):
+            hosts = [hosts]
+        results = await self.probe_many([(host, port) for host in hosts])
+        answered = [rtt for rtt in results.values() if rtt is not None]
+        return round(sum(answered) / len(answered), 2) if answered else None
+
+    def stats(self):
+        return {
+            "sent": self.sent,
+            "lost": self.lost,
+            "icmp": self.icmp_available,
+            "icmp_blocked": len(self.icmp_blocked),
+        }
@@ -0,0 +1,103 @@
+import os
+import time
+import psutil
+import dotenv
+
+dotenv.load_dotenv()
+
+# Bulunan oyun bağlantısı bu süre boyunca yeniden sorgulanmadan kullanılır.
+CONNECTION_TTL = float(os.getenv("Health_Connection_TTL") or 5)
+# PID yeniden kullanımı kaçmasın diye tüm süreçler bu aralıkla baştan incelenir.
+RESCAN_INTERVAL = 300
+NO_CONNECTION = (None, None, None, None)
+
+
+def tcp_connections(proc):
+    # psutil 6 connections() yerine net_connections() kullanır.
+    method = getattr(proc, "net_connections", None) or proc.connections
+    return method(kind="tcp")
+
+
+class ClientProcesses:
+    """client_name süreçlerini PID listesinin farkı üzerinden izler.
+
+    psutil.pids() ucuzdur; yalnızca önceki taramadan sonra başlayan
+    süreçlerin adına bakılır, sonlananlar listeden düşer. Bağlantılar tüm
+    makinenin soket tablosundan değil, yalnızca izlenen süreçlerden sorgulanır.
+    """
+
+    def __init__(self, name, ignore_ports=()):
+        self.name = (name or "").lower()
+        self.ignore_ports = set(ignore_ports)
+        self.pids = set()
+        self.clients = {}
+        self.rescanned_at = 0.0
+        self.connection = NO_CONNECTION
+        self.connection_at = None
+        self.inspected = 0
+        self.queries = 0
+
+    def inspect(self, pid):
+        self.inspected += 1
+        try:
+            proc = psutil.Process(pid)
+            if self.name and self.name in proc.name().lower():
+                self.clients[pid] = proc
+        except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
+            pass
+
+    def refresh(self):
+        """Süreç başlangıç/çıkışlarını işler ve izlenen istemci süreçlerini döndürür."""
+        pids = set(psutil.pids())
+        now = time.monotonic()
+        if now - self.rescanned_at > RESCAN_INTERVAL:
+            self.rescanned_at = now
+            self.clients.clear()
+            new = pids
+        else:
+            new = pids - self.pids
+        for pid in self.pids - pids:
+            self.clients.pop(pid, None)
+        for pid in new:
+            self.inspect(pid)
+        # Aynı PID'i alan farklı bir süreç create_time ile ayırt edilir.
+        for pid, proc in list(self.clients.items()):
+            if not proc.is_running():
+                del self.clients[pid]
+        self.pids = pids
+        return self.clients
+
+    def find_connection(self):
+        """İzlenen istemcilerin dışarıya kurulu ilk TCP bağlantısı (laddr.ip, laddr.port, raddr.ip, raddr.port)."""
+        for pid, proc in list(self.clients.items()):
+            self.queries += 1
+            try:
+                connections = tcp_connections(proc)
+            except (psutil.NoSuchProcess, psutil.ZombieProcess):
+                self.clients.pop(pid, None)
+                continue
+            except psutil.AccessDenied:
+                continue
+            for conn in connections:
+                laddr, raddr = conn.laddr, conn.raddr
+                if conn.status != psutil.CONN_ESTABLISHED or not (laddr and raddr):
+                    continue
+                if raddr.port in self.ignore_ports or laddr.port in self.ignore_ports:
+                    continue
+                if raddr.ip == "127.0.0.1":  # Yerel bağlantıları ignore et
+                    continue
+                return laddr.ip, laddr.port, raddr.ip, raddr.port
+        return NO_CONNECTION
+
+    def active_connection(self, ttl=CONNECTION_TTL):
+        """Önbellekteki sonuç ttl saniyeden yeniyse onu, değilse yeni sorgunun sonucunu döndürür."""
+        now = time.monotonic()
+        if self.connection_at is not None and now - self.connection_at < ttl:
+            return self.connection
+        self.refresh()
+        self.connection = self.find_connection() if self.clients else NO_CONNECTION
+        self.connection_at = now
+        return self.connection
+
+    def invalidate(self):
+        self.connection_at = None
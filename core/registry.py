@@ -0,0 +1,165 @@
+import threading
+from core import console
+
+log = console.get("hub")
+
+UPSERT = "upsert"
+PATCH = "patch"
+REMOVE = "remove"
+
+
+class ServerRegistry:
+    """Sunucu ID'sine göre anahtarlanmış, sürümlü sunucu listesi.
+
+    HUB'dan gelen tam liste ve delta mesajları (upsert/patch/remove) buraya
+    uygulanır; yalnızca gerçekten değişen kayıtlar için abonelere
+    callback(event, server_id, server) çağrılır. Callback'ler HUB thread'inde
+    çalışır.
+    """
+
+    def __init__(self):
+        self.servers = {}
+        self.versions = {}
+        self.version = 0
+        # HUB'ın mesajlarla gönderdiği akış sırası; yeniden bağlanırken resume için kullanılır.
+        self.seq = 0
+        self.subscribers = []
+        self.lock = threading.RLock()
+
+    def __len__(self):
+        return len(self.servers)
+
+    def get(self, server_id):
+        with self.lock:
+            return self.servers.get(server_id)
+
+    def snapshot(self):
+        with self.lock:
+            return list(self.servers.values())
+
+    def subscribe(self, callback):
+        """callback'i değişikliklere abone eder, aboneliği iptal eden fonksiyon döndürür."""
+        with self.lock:
+            self.subscribers.append(callback)
+        return lambda: self.subscribers.remove(callback)
+
+    def notify(self, event, server_id, server):
+        for callback in list(self.subscribers):
+            try:
+                callback(event, server_id, server)
+            except Exception as e:
+                log.error("Registry abone hatası: %r", e)
+
+    def accept(self, server_id, version):
+        """Sürüm verilmişse eskisini geçmiyorsa değişikliği reddeder; sürümsüz değişiklik kabul edilir
+        ve HUB'ın sürümlerini gölgelememek için sürüm kaydına dokunmaz."""
+        if version is None:
+            return True
+        if version <= self.versions.get(server_id, -1):
+            return False
+        self.versions[server_id] = version
+        return True
+
+    def upsert(self, server, version=None):
+        server_id = server.get("ID")
+        if server_id is None:
+            return False
+        with self.lock:
+            if self.servers.get(server_id) == server:
+                return False
+            if not self.accept(server_id, version):
+                return False
+            self.servers[server_id] = server
+            self.version += 1
+        self.notify(UPSERT, server_id, server)
+        return True
+
+    def patch(self, server_id, fields, version=None):
+        with self.lock:
+            current = self.servers.get(server_id)
+            if current is None or all(current.get(k) == v for k, v in fields.items()):
+                return False
+            if not self.accept(server_id, version):
+                return False
+            server = {**current, **fields}
+            self.servers[server_id] = server
+            self.version += 1
+        self.notify(PATCH, server_id, server)
+        return True
+
+    def remove(self, server_id, version=None):
+        with self.lock:
+            if server_id not in self.servers:
+                return False
+            if not self.accept(server_id, version):
+                return False
+            server = self.servers.pop(server_id)
+            self.version += 1
+        self.notify(REMOVE, server_id, server)
+        return True
+
+    def replace(self, servers):
+        """Tam listeyi yetkili kabul eder: kayıtlar ve sürümler listeden yeniden kurulur.
+
+        HUB yeniden başlayıp sürümleri baştan saydığında da liste ve sonraki
+        deltalar reddedilmez.
+        """
+        incoming = {}
+        versions = {}
+        for server in servers:
+            server_id = server.get("ID")
+            if server_id is None:
+                continue
+            incoming[server_id] = server
+            if server.get("version") is not None:
+                versions[server_id] = server["version"]
+        events = []
+        with self.lock:
+            for server_id, server in incoming.items():
+                if self.servers.get(server_id) != server:
+                    events.append((UPSERT, server_id, server))
+            for server_id in self.servers.keys() - incoming.keys():
+                events.append((REMOVE, server_id, self.servers[server_id]))
+            self.servers.clear()
+            self.servers.update(incoming)
+            self.versions = versions
+            self.version += len(events)
+        for event in events:
+            self.notify(*event)
+        return len(events)
+
+    def apply(self, data):
+        """HUB mesajının data kısmını uygular, değişen kayıt sayısını döndürür.
+
+        Desteklenen türler:
+          {"type": "request", "value": "servers", "data": [...]}    tam/kısmi liste
+          {"type": "server_upsert", "data": {...}, "version": n}
+          {"type": "server_patch", "target": ID, "data": {...}, "version": n}
+          {"type": "server_remove", "target": ID, "version": n}
+
+        Listede "full": true varsa liste yetkilidir (bkz. replace); listede
+        olmayan sunucular silinir ve sürümler listeden alınır. Herhangi
+        bir mesajdaki "seq" alanı self.seq'e işlenir.
+        """
+        msg_type = data.get("type")
+        version = data.get("version")
+        changed = 0
+        if msg_type == "request" and data.get("value") == "servers":
+            servers = data.get("data")
+            if not isinstance(servers, list):
+                raise ValueError("Geçersiz server listesi formatı")
+            servers = [server for server in servers if isinstance(server, dict)]
+            if data.get("full"):
+                changed = self.replace(servers)
+            else:
+                changed = sum(self.upsert(server, server.get("version")) for server in servers)
+        elif msg_type == "server_upsert":
+            changed = int(self.upsert(data["data"], version))
+        elif msg_type == "server_patch":
+            changed = int(self.patch(data["target"], data["data"], version))
+        elif msg_type == "server_remove":
+            changed = int(self.remove(data["target"], version))
+        seq = data.get("seq")
+        if isinstance(seq, int) and seq > self.seq:
+            self.seq = seq
+        return changed
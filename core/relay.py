@@ -0,0 +1,59 @@
+import os
+import dotenv
+
+dotenv.load_dotenv()
+
+# Tek okumada alınacak en büyük parça. Oyun paketleri küçük olsa da kalabalık
+# bölgelerde upstream tek seferde onlarca paket gönderir.
+BUFFER_SIZE = int(os.getenv("Relay_Buffer") or 64 * 1024)
+# Yazma tamponu bu sınırı aşmadıkça drain() beklenmez.
+HIGH_WATER = BUFFER_SIZE * 4
+
+
+class ByteCounter:
+    """Relay döngüsünün parça başına artırdığı tek alanlı sayaç."""
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = 0
+
+
+def tune_writer(writer):
+    """Transport'un yazma sınırlarını relay tamponuna göre ayarlar."""
+    transport = writer.transport
+    try:
+        transport.set_write_buffer_limits(high=HIGH_WATER)
+    except (AttributeError, NotImplementedError):
+        pass
+
+
+async def pump(reader, writer, buffer_size=BUFFER_SIZE, on_chunk=None, counter=None):
+    """reader -> writer yönünde veri aktarır ve aktarılan byte sayısını döndürür.
+
+    on_chunk verilmediğinde parça başına hiçbir ek iş yapılmaz; drain() sadece
+    transport tamponu dolduğunda beklenir. counter verilirse (ByteCounter)
+    anlık toplam ona yazılır. Akış bittiğinde writer kapatılır, böylece karşı
+    yöndeki pump da EOF alıp sonlanır.
+    """
+    transport = writer.transport
+    read = reader.read
+    write = writer.write
+    if counter is None:
+        counter = ByteCounter()
+    try:
+        if on_chunk is None:
+            while data := await read(buffer_size):
+                write(data)
+                counter.value += len(data)
+                if transport.get_write_buffer_size() > HIGH_WATER:
+                    await writer.drain()
+        else:
+            while data := await read(buffer_size):
+                on_chunk(data)
+                write(data)
+                counter.value += len(data)
+                if transport.get_write_buffer_size() > HIGH_WATER:
+                    await writer.drain()
+    finally:
+        writer.close()
+    return counter.value
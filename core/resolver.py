@@ -0,0 +1,128 @@
+import os
+import time
+import socket
+import asyncio
+import ipaddress
+import dotenv
+from core import console
+
+dotenv.load_dotenv()
+
+log = console.get("relay")
+
+# getaddrinfo kaydın gerçek TTL'ini vermez, bu yüzden sabit bir TTL kullanılır.
+DNS_TTL = float(os.getenv("DNS_TTL") or 300)
+# Çözümleyici hata verdiğinde eski kayıtlar bu süre boyunca kullanılmaya devam eder.
+DNS_STALE = float(os.getenv("DNS_Stale") or 3600)
+# Süresi dolmuş ama eski kaydı olan host için ön planda en fazla bu kadar beklenir (saniye);
+# sorgu arka planda sürer ve tamamlanınca önbelleği günceller.
+DNS_TIMEOUT = float(os.getenv("DNS_Timeout") or 2)
+REFRESH_RATIO = 0.8
+
+
+class ResolverEntry:
+    __slots__ = ("addresses", "resolved_at")
+
+    def __init__(self, addresses, resolved_at):
+        self.addresses = addresses
+        self.resolved_at = resolved_at
+
+
+class ResolverCache:
+    """Host başına tüm A kayıtlarını TTL ile saklayan async DNS önbelleği.
+
+    Süresi dolmak üzere olan kayıtlar arka planda yenilenir, çözümleme
+    başarısız olursa eski kayıtlar DNS_Stale süresince sunulur.
+    """
+
+    def __init__(self, ttl=DNS_TTL, stale_ttl=DNS_STALE, timeout=DNS_TIMEOUT):
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.timeout = timeout
+        self.entries = {}
+        self.inflight = {}
+        # Arka plan yenilemeleri; referans tutulmazsa görev tamamlanmadan toplanabilir.
+        self.background = set()
+        self.task = None
+
+    @staticmethod
+    def is_literal(host):
+        try:
+            ipaddress.ip_address(host)
+            return True
+        except ValueError:
+            return False
+
+    async def lookup(self, host):
+        loop = asyncio.get_running_loop()
+        infos = await loop.getaddrinfo(host, None, family=socket.AF_INET, type=socket.SOCK_STREAM)
+        addresses = list(dict.fromkeys(info[4][0] for info in infos))
+        if not addresses:
+            raise OSError(f"{host} için A kaydı bulunamadı")
+        self.entries[host] = ResolverEntry(addresses, time.monotonic())
+        return addresses
+
+    async def refresh(self, host, timeout=None):
+        """Aynı host için eşzamanlı çözümlemeleri tek sorguda birleştirir.
+
+        timeout verilirse en fazla o kadar beklenir; sorgu iptal edilmez.
+        """
+        task = self.inflight.get(host)
+        if task is None:
+            task = asyncio.ensure_future(self.lookup(host))
+            self.inflight[host] = task
+            task.add_done_callback(lambda _: self.inflight.pop(host, None))
+        if timeout is None:
+            return await asyncio.shield(task)
+        return await asyncio.wait_for(asyncio.shield(task), timeout)
+
+    def refresh_later(self, host):
+        task = asyncio.ensure_future(self.refresh_quietly(host))
+        self.background.add(task)
+        task.add_done_callback(self.background.discard)
+
+    async def resolve(self, host):
+        """host'un IPv4 adres listesini döndürür."""
+        if self.is_literal(host):
+            return [host]
+        entry = self.entries.get(host)
+        now = time.monotonic()
+        if entry and now - entry.resolved_at < self.ttl:
+            if now - entry.resolved_at > self.ttl * REFRESH_RATIO and host not in self.inflight:
+                self.refresh_later(host)
+            return entry.addresses
+        stale = entry is not None and now - entry.resolved_at < self.stale_ttl
+        try:
+            # Eski kayıt varsa çözümleyici kesintisinde sistem zaman aşımı beklenmez.
+            return await self.refresh(host, self.timeout if stale else None)
+        except (OSError, asyncio.TimeoutError) as e:
+            if stale:
+                log.warning("DNS: %s çözümlenemedi (%r), eski kayıtlar kullanılıyor", host, e)
+                return entry.addresses
+            raise
+
+    async def refresh_quietly(self, host):
+        try:
+            await self.refresh(host)
+        except OSError as e:
+            log.warning("DNS: %s yenilenemedi: %s", host, e)
+
+    def start(self, hosts):
+        """hosts için önbelleği ısıtır ve arka plan yenilemesini başlatır."""
+        hosts = [host for host in hosts if not self.is_literal(host)]
+        if hosts and self.task is None:
+            self.task = asyncio.create_task(self.maintain(hosts))
+
+    async def stop(self):
+        if self.task:
+            self.task.cancel()
+            await asyncio.gather(self.task, return_exceptions=True)
+            self.task = None
+        for task in list(self.background):
+            task.cancel()
+        await asyncio.gather(*self.background, return_exceptions=True)
+
+    async def maintain(self, hosts):
+        while True:
+            await asyncio.gather(*(self.refresh_quietly(host) for host in hosts))
+            await asyncio.sleep(self.ttl * REFRESH_RATIO)
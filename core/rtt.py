@@ -0,0 +1,71 @@
+import sys
+import time
+import socket
+import struct
+import statistics
+
+# struct tcp_info'da tcpi_rtt ve tcpi_rttvar (mikrosaniye): 8 byte'lık u8 alanlardan
+# sonraki 16. ve 17. u32.
+TCP_INFO_RTT_OFFSET = 8 + 15 * 4
+TCP_INFO_SIZE = TCP_INFO_RTT_OFFSET + 8
+# Zamanlama örnekleri oturum başına en fazla bu kadar tutulur.
+MAX_SAMPLES = 64
+# Daha uzun süren yanıt bir istek-yanıt çifti değil, sunucunun kendiliğinden gönderdiği veri sayılır.
+MAX_RESPONSE = 5.0
+
+
+def tcp_info_rtt(sock):
+    """Çekirdeğin ölçtüğü düzgünleştirilmiş RTT (ms); yalnızca Linux'ta, yoksa None."""
+    if sock is None or not sys.platform.startswith("linux") or not hasattr(socket, "TCP_INFO"):
+        return None
+    try:
+        info = sock.getsockopt(socket.IPPROTO_TCP, socket.TCP_INFO, TCP_INFO_SIZE)
+    except OSError:
+        return None
+    if len(info) < TCP_INFO_SIZE:
+        return None
+    rtt, _ = struct.unpack_from("II", info, TCP_INFO_RTT_OFFSET)
+    return rtt / 1000 if rtt else None
+
+
+class RttTracker:
+    """Relay edilen oturumdan ek paket göndermeden gecikme tahmini.
+
+    Linux'ta upstream soketinin TCP_INFO RTT'si kullanılır. Diğer
+    sistemlerde istemciden upstream'e giden bir parçadan sonra gelen ilk
+    aşağı yönlü parçaya kadar geçen süre örneklenir; sunucunun kendiliğinden
+    gönderdiği veriler bu örnekleri aşağı çektiğinden sonuç örneklerin
+    medyanıdır. sent()/received() yalnızca timed doğruysa (TCP_INFO yoksa)
+    relay döngüsünde parça başına çağrılmalıdır.
+    """
+    __slots__ = ("sock", "timed", "pending", "samples", "last")
+
+    def __init__(self, sock=None):
+        self.sock = sock
+        # TCP_INFO okunabiliyorsa parça başına zamanlamaya gerek yok.
+        self.timed = tcp_info_rtt(sock) is None
+        self.pending = None
+        self.samples = []
+        self.last = None
+
+    def sent(self, *_):
+        if self.pending is None:
+            self.pending = time.perf_counter()
+
+    def received(self, *_):
+        if self.pending is None:
+            return
+        elapsed = time.perf_counter() - self.pending
+        self.pending = None
+        if elapsed < MAX_RESPONSE and len(self.samples) < MAX_SAMPLES:
+            self.samples.append(elapsed * 1000)
+
+    def sample(self):
+        """Son çağrıdan bu yana gecikme (ms); ölçüm yoksa None."""
+        rtt = tcp_info_rtt(self.sock)
+        if rtt is None and self.samples:
+            rtt = statistics.median(self.samples)
+            self.samples = []
+        if rtt is not None:
+            self.last = rtt
+        return rtt
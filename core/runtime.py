@@ -0,0 +1,177 @@
+import time
+import queue
+import asyncio
+import threading
+from core import console
+
+log = console.get("runtime")
+
+# Hata ile biten görevin yeniden başlatılmadan önce beklediği süre (saniye), her hatada ikiye katlanır.
+RESTART_MIN = 1.0
+RESTART_MAX = 30.0
+# Bu süreden uzun çalışmış bir görev sağlıklı sayılır ve bekleme süresi sıfırlanır.
+STABLE_AFTER = 60.0
+
+
+class Runtime:
+    """Tek event loop'u sahiplenen uzun ömürlü thread ve görev gözetmeni.
+
+    HUB bağlantısı, broadcast dinleyici, heartbeat, sağlık raporu ve
+    gateway'ler aynı loop'ta çalışır. Diğer thread'ler loop'a yalnızca
+    submit()/call() ile erişir.
+    """
+
+    def __init__(self, name="runtime"):
+        self.name = name
+        self.loop = None
+        self.thread = None
+        self.tasks = {}
+        self.restarts = {}
+        self.cleanups = []
+        self.lock = threading.Lock()
+
+    def start(self):
+        with self.lock:
+            if self.loop is None:
+                self.loop = asyncio.new_event_loop()
+                self.thread = threading.Thread(target=self.run, name=self.name, daemon=True)
+                self.thread.start()
+        return self.loop
+
+    def run(self):
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_forever()
+
+    def submit(self, coro):
+        """Coroutine'i runtime loop'una gönderir, concurrent.futures.Future döner."""
+        return asyncio.run_coroutine_threadsafe(coro, self.start())
+
+    def call(self, callback, *args):
+        self.start().call_soon_threadsafe(callback, *args)
+
+    def supervise(self, name, factory, restart=True):
+        """factory() coroutine'ini name adıyla çalıştırır.
+
+        Görev hata ile biterse restart=True iken artan beklemeyle yeniden
+        başlatılır; normal biterse tekrar başlatılmaz. Aynı isimde bir görev
+        varsa önce o durdurulur.
+        """
+        return self.submit(self.spawn(name, factory, restart))
+
+    async def spawn(self, name, factory, restart=True):
+        await self.cancel_task(name)
+        self.restarts.setdefault(name, 0)
+        self.tasks[name] = asyncio.create_task(self.keep(name, factory, restart), name=name)
+
+    async def keep(self, name, factory, restart):
+        delay = RESTART_MIN
+        while True:
+            started = time.monotonic()
+            try:
+                await factory()
+                return
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                log.error("%s hata ile durdu: %r", name, e)
+                if not restart:
+                    return
+            if time.monotonic() - started > STABLE_AFTER:
+                delay = RESTART_MIN
+            self.restarts[name] += 1
+            log.warning("%s %.0f sn sonra yeniden başlatılacak", name, delay)
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, RESTART_MAX)
+
+    async def cancel_task(self, name):
+        task = self.tasks.pop(name, None)
+        if task and task is not asyncio.current_task():
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+
+    def cancel(self, name):
+        return self.submit(self.cancel_task(name))
+
+    def on_shutdown(self, cleanup):
+        """Kapanışta (görevler durdurulduktan sonra, ters sırayla) beklenecek async fonksiyon ekler."""
+        self.cleanups.append(cleanup)
+
+    async def stop_all(self):
+        for name in list(self.tasks):
+            await self.cancel_task(name)
+        for cleanup in reversed(self.cleanups):
+            try:
+                await cleanup()
+            except Exception as e:
+                log.error("Kapanış hatası: %r", e)
+        self.cleanups.clear()
+        await self.loop.shutdown_default_executor()
+
+    def shutdown(self, timeout=5.0):
+        """Görevleri iptal eder, temizlik fonksiyonlarını çalıştırır ve loop thread'ini durdurur."""
+        if self.loop is None:
+            return
+        try:
+            self.submit(self.stop_all()).result(timeout)
+        except Exception as e:
+            log.error("Kapanış tamamlanamadı: %r", e)
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join(timeout)
+        if not self.thread.is_alive():
+            self.loop.close()
+        self.loop = self.thread = None
+
+    def status(self):
+        return {
+            name: {"running": not task.done(), "restarts": self.restarts.get(name, 0)}
+            for name, task in list(self.tasks.items())
+        }
+
+
+class TkBridge:
+    """Runtime thread'inden Tk thread'ine geri çağrı taşır.
+
+    Tk nesnelerine yalnızca Tk thread'inden dokunulabildiğinden sonuçlar bir
+    kuyruğa yazılır ve widget.after() ile Tk thread'inde boşaltılır.
+    """
+
+    def __init__(self, widget, interval=50):
+        self.widget = widget
+        self.interval = interval
+        self.queue = queue.SimpleQueue()
+        self.widget.after(interval, self.pump)
+
+    def post(self, callback, *args):
+        """Herhangi bir thread'den çağrılabilir; callback Tk thread'inde çalışır."""
+        self.queue.put((callback, args))
+
+    def pump(self):
+        while True:
+            try:
+                callback, args = self.queue.get_nowait()
+            except queue.Empty:
+                break
+            try:
+                callback(*args)
+            except Exception as e:
+                log.error("Tk geri çağrı hatası: %r", e)
+        self.widget.after(self.interval, self.pump)
+
+    def run(self, runtime, coro, callback=None, errback=None):
+        """coro'yu runtime'da çalıştırır; sonucu callback'e, hatayı errback'e Tk thread'inde verir."""
+        future = runtime.submit(coro)
+        future.add_done_callback(lambda f: self.post(self.deliver, f, callback, errback))
+        return future
+
+    @staticmethod
+    def deliver(future, callback, errback):
+        if future.cancelled():
+            return
+        error = future.exception()
+        if error is not None:
+            if errback:
+                errback(error)
+            else:
+                log.error("Görev hatası: %r", error)
+        elif callback:
+            callback(future.result())
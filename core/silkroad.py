@@ -0,0 +1,121 @@
+import time
+
+# Silkroad paket başlığı: uint16 boyut, uint16 opcode, uint8 security count,
+# uint8 security crc. Boyutun en üst biti paketin şifreli olduğunu belirtir;
+# şifreli paketlerde boyuttan sonraki kısım 8 byte'lık bloklara tamamlanır ve
+# opcode okunamaz.
+HEADER_SIZE = 6
+ENCRYPTED_FLAG = 0x8000
+SIZE_MASK = 0x7FFF
+ENCRYPTED = -1
+
+
+def packet_length(size_field):
+    """Boyut alanından başlık dahil toplam paket uzunluğunu hesaplar."""
+    if size_field & ENCRYPTED_FLAG:
+        return 2 + ((4 + (size_field & SIZE_MASK) + 7) & ~7)
+    return HEADER_SIZE + size_field
+
+
+class OpcodeStats:
+    __slots__ = ("count", "bytes", "last_seen", "gap_avg", "gap_max")
+
+    def __init__(self):
+        self.count = 0
+        self.bytes = 0
+        self.last_seen = 0.0
+        self.gap_avg = 0.0
+        self.gap_max = 0.0
+
+
+class PacketStats:
+    """Opcode başına paket sayısı, byte toplamı ve paketler arası süre (ms)."""
+
+    def __init__(self, alpha=0.1):
+        self.alpha = alpha
+        self.opcodes = {}
+        self.packets = 0
+        self.bytes = 0
+
+    def record(self, opcode, length, now):
+        st = self.opcodes.get(opcode)
+        if st is None:
+            st = self.opcodes[opcode] = OpcodeStats()
+        elif st.count:
+            gap = (now - st.last_seen) * 1000
+            st.gap_avg += self.alpha * (gap - st.gap_avg)
+            if gap > st.gap_max:
+                st.gap_max = gap
+        st.count += 1
+        st.bytes += length
+        st.last_seen = now
+        self.packets += 1
+        self.bytes += length
+
+    def top(self, n=10, key="bytes"):
+        """En çok byte (veya key ile verilen alan) harcayan n opcode."""
+        ordered = sorted(self.opcodes.items(), key=lambda item: getattr(item[1], key), reverse=True)
+        return [
+            {
+                "opcode": "encrypted" if opcode == ENCRYPTED else f"0x{opcode:04X}",
+                "count": st.count,
+                "bytes": st.bytes,
+                "share": st.bytes / self.bytes if self.bytes else 0.0,
+                "gap_avg_ms": round(st.gap_avg, 2),
+                "gap_max_ms": round(st.gap_max, 2),
+            }
+            for opcode, st in ordered[:n]
+        ]
+
+
+async def frame_pump(reader, writer, stats, buffer_size=64 * 1024, on_packet=None, counter=None):
+    """Akışı Silkroad paketlerine bölerek aktarır.
+
+    Okunan parça içindeki tüm tam paketler tek write ile gönderilir, yarım
+    kalan paket bir sonraki okumaya kadar bekletilir. Aktarılan byte
+    sayısını döndürür; counter verilirse anlık toplam ona da yazılır.
+    """
+    transport = writer.transport
+    high_water = buffer_size * 4
+    pending = b""
+    total = 0
+    try:
+        while data := await reader.read(buffer_size):
+            buf = pending + data if pending else data
+            end = len(buf)
+            offset = 0
+            now = time.monotonic()
+            while end - offset >= HEADER_SIZE:
+                size_field = buf[offset] | buf[offset + 1] << 8
+                length = packet_length(size_field)
+                if end - offset < length:
+                    break
+                if size_field & ENCRYPTED_FLAG:
+                    opcode = ENCRYPTED
+                else:
+                    opcode = buf[offset + 2] | buf[offset + 3] << 8
+                stats.record(opcode, length, now)
+                if on_packet is not None:
+                    on_packet(opcode, buf[offset:offset + length])
+                offset += length
+            if offset == end:
+                writer.write(buf)
+                pending = b""
+            elif offset:
+                writer.write(buf[:offset])
+                pending = buf[offset:]
+            else:
+                pending = buf
+            total += offset
+            if counter is not None:
+                counter.value = total
+            if transport.get_write_buffer_size() > high_water:
+                await writer.drain()
+        if pending:
+            writer.write(pending)
+            total += len(pending)
+            if counter is not None:
+                counter.value = total
+    finally:
+        writer.close()
+    return total
@@ -0,0 +1,255 @@
+import os
+import time
+import asyncio
+import dotenv
+from collections import deque
+from core import console
+
+dotenv.load_dotenv()
+
+log = console.get("relay")
+
+# Bir sonraki host'a paralel deneme başlatmadan önce beklenen süre (happy eyeballs).
+STAGGER = float(os.getenv("Upstream_Stagger") or 0.25)
+CONNECT_TIMEOUT = float(os.getenv("Upstream_Timeout") or 2.0)
+# Tüm liste bu kadar tur denenir.
+ROUNDS = int(os.getenv("Upstream_Rounds") or 3)
+# Host başına hazır bekletilecek bağlantı sayısı, 0 ise havuz kapalı.
+POOL_SIZE = int(os.getenv("Gateway_Pool") or 0)
+# Silkroad gateway'leri el sıkışmasız bağlantıları bir süre sonra düşürür,
+# bu yüzden boşta bekleyen soketler bu süreden önce yenilenir.
+POOL_MAX_IDLE = float(os.getenv("Gateway_Pool_Idle") or 15.0)
+POOL_CHECK_INTERVAL = 2.0
+
+
+class UpstreamStats:
+    """Bir upstream host için kayan bağlantı gecikmesi ve hata oranı."""
+    __slots__ = ("latency", "fail_rate", "successes", "failures")
+
+    def __init__(self):
+        self.latency = None
+        self.fail_rate = 0.0
+        self.successes = 0
+        self.failures = 0
+
+
+class UpstreamSelector:
+    """Upstream adreslerini gecikme ve hata skoruna göre sıralar ve yarıştırır.
+
+    resolver verildiğinde her host'un tüm A kayıtları ayrı aday olarak
+    değerlendirilir, istatistikler adres başına tutulur.
+    """
+
+    def __init__(self, hosts, port, resolver=None, stagger=STAGGER, timeout=CONNECT_TIMEOUT, rounds=ROUNDS, alpha=0.3):
+        self.hosts = list(hosts)
+        self.port = port
+        self.resolver = resolver
+        self.stagger = stagger
+        self.timeout = timeout
+        self.rounds = rounds
+        self.alpha = alpha
+        self.addresses = {host: [host] for host in self.hosts}
+        self.stats = {host: UpstreamStats() for host in self.hosts}
+
+    def record_success(self, addr, latency_ms):
+        st = self.stats.setdefault(addr, UpstreamStats())
+        st.latency = latency_ms if st.latency is None else st.latency + self.alpha * (latency_ms - st.latency)
+        st.fail_rate -= self.alpha * st.fail_rate
+        st.successes += 1
+
+    def record_failure(self, addr):
+        st = self.stats.setdefault(addr, UpstreamStats())
+        st.fail_rate += self.alpha * (1.0 - st.fail_rate)
+        st.failures += 1
+
+    def score(self, addr, default_latency=0.0):
+        """Düşük skor daha iyi: ortalama gecikme + hata oranı kadar timeout cezası."""
+        st = self.stats.get(addr)
+        if st is None:
+            return default_latency
+        latency = default_latency if st.latency is None else st.latency
+        return latency + st.fail_rate * self.timeout * 1000
+
+    def targets(self):
+        return [(host, addr) for host in self.hosts for addr in self.addresses[host]]
+
+    def ranked(self, targets=None):
+        """(host, adres) çiftlerini en iyiden kötüye sıralar."""
+        if targets is None:
+            targets = self.targets()
+        known = [st.latency for st in self.stats.values() if st.latency is not None]
+        default = sum(known) / len(known) if known else 0.0
+        return sorted(targets, key=lambda target: self.score(target[1], default))
+
+    def ranked_hosts(self):
+        return list(dict.fromkeys(host for host, _ in self.ranked()))
+
+    def best_address(self, host):
+        return self.ranked([(host, addr) for addr in self.addresses[host]])[0][1]
+
+    def fail_rate(self, host):
+        return min(self.stats.get(addr, UpstreamStats()).fail_rate for addr in self.addresses[host])
+
+    async def resolve(self):
+        """Resolver'dan güncel adresleri alır, çözümlenemeyen host eski adreslerini korur."""
+        if self.resolver is None:
+            return self.targets()
+        results = await asyncio.gather(
+            *(self.resolver.resolve(host) for host in self.hosts),
+            return_exceptions=True
+        )
+        for host, result in zip(self.hosts, results):
+            if isinstance(result, BaseException):
+                log.warning("%s çözümlenemedi: %s", host, result)
+                continue
+            self.addresses[host] = result
+        return self.targets()
+
+    async def attempt(self, host, addr=None):
+        addr = addr or host
+        start = time.perf_counter()
+        try:
+            reader, writer = await asyncio.wait_for(
+                asyncio.open_connection(addr, self.port),
+                timeout=self.timeout
+            )
+        except (OSError, asyncio.TimeoutError) as e:
+            self.record_failure(addr)
+            log.debug("Deneme başarısız: %s (%s):%s (%s)", host, addr, self.port, type(e).__name__)
+            return None
+        self.record_success(addr, (time.perf_counter() - start) * 1000)
+        return host, reader, writer
+
+    async def race(self, targets):
+        queue = list(targets)
+        pending = set()
+        try:
+            while queue or pending:
+                if queue:
+                    pending.add(asyncio.create_task(self.attempt(*queue.pop(0))))
+                done, pending = await asyncio.wait(
+                    pending,
+                    timeout=self.stagger if queue else None,
+                    return_when=asyncio.FIRST_COMPLETED
+                )
+                winner = None
+                for task in done:
+                    result = task.result()
+                    if result and winner is None:
+                        winner = result
+                    elif result:
+                        result[2].close()
+                if winner:
+                    return winner
+            return None
+        finally:
+            for task in pending:
+                task.cancel()
+            for result in await asyncio.gather(*pending, return_exceptions=True):
+                if isinstance(result, tuple):
+                    result[2].close()
+
+    async def connect(self):
+        """En iyi skorlu host'tan başlayarak kademeli paralel bağlanır.
+
+        İlk başarılı bağlantı (host, reader, writer) olarak döner, hiçbiri
+        bağlanamazsa None döner.
+        """
+        for _ in range(self.rounds):
+            result = await self.race(self.ranked(await self.resolve()))
+            if result:
+                return result
+        return None
+
+
+class UpstreamPool:
+    """Her upstream host için önceden açılmış boşta bağlantılar tutar.
+
+    Sunucunun bağlantı açılır açılmaz gönderdiği veriler StreamReader'da
+    bekler, istemci bağlandığında relay ile birlikte aktarılır.
+    """
+
+    def __init__(self, selector, size=POOL_SIZE, max_idle=POOL_MAX_IDLE, check_interval=POOL_CHECK_INTERVAL):
+        self.selector = selector
+        self.size = size
+        self.max_idle = max_idle
+        self.check_interval = check_interval
+        self.idle = {host: deque() for host in selector.hosts}
+        self.refill = None
+        self.task = None
+        self.hits = 0
+        self.misses = 0
+
+    def start(self):
+        self.refill = asyncio.Event()
+        self.task = asyncio.create_task(self.maintain())
+
+    async def stop(self):
+        if self.task:
+            self.task.cancel()
+            await asyncio.gather(self.task, return_exceptions=True)
+            self.task = None
+        for entries in self.idle.values():
+            while entries:
+                entries.popleft()[2].close()
+
+    def healthy(self, entry, now):
+        created, reader, writer = entry
+        if now - created > self.max_idle:
+            return False
+        if writer.is_closing() or reader.at_eof() or reader.exception() is not None:
+            return False
+        return True
+
+    def evict(self):
+        now = time.monotonic()
+        for entries in self.idle.values():
+            for _ in range(len(entries)):
+                entry = entries.popleft()
+                if self.healthy(entry, now):
+                    entries.append(entry)
+                else:
+                    entry[2].close()
+
+    def acquire(self):
+        """En iyi skorlu host'un hazır bağlantısını (host, reader, writer) olarak verir."""
+        now = time.monotonic()
+        for host in self.selector.ranked_hosts():
+            entries = self.idle.get(host)
+            while entries:
+                entry = entries.popleft()
+                if self.healthy(entry, now):
+                    self.hits += 1
+                    self.refill.set()
+                    return host, entry[1], entry[2]
+                entry[2].close()
+        self.misses += 1
+        if self.refill:
+            self.refill.set()
+        return None
+
+    async def fill(self, host):
+        result = await self.selector.attempt(host, self.selector.best_address(host))
+        if result:
+            self.idle[host].append((time.monotonic(), result[1], result[2]))
+
+    async def maintain(self):
+        while True:
+            self.evict()
+            await self.selector.resolve()
+            jobs = []
+            for host, entries in self.idle.items():
+                missing = self.size - len(entries)
+                # Sürekli hata veren host'lar her turda yalnızca bir kez yoklanır.
+                if missing > 0 and self.selector.fail_rate(host) > 0.5:
+                    missing = 1
+                jobs.extend(self.fill(host) for _ in range(missing))
+            if jobs:
+                await asyncio.gather(*jobs, return_exceptions=True)
+            self.refill.clear()
+            # wait_for, olay ile iptal aynı anda gelirse iptali yutabiliyor.
+            waiter = asyncio.ensure_future(self.refill.wait())
+            try:
+                await asyncio.wait({waiter}, timeout=self.check_interval)
+            finally:
+                waiter.cancel()
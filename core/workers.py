@@ -0,0 +1,112 @@
+import os
+import time
+import queue
+import socket
+import asyncio
+import threading
+import multiprocessing
+import dotenv
+from core import console
+
+dotenv.load_dotenv()
+
+log = console.get("relay")
+
+WORKERS = int(os.getenv("Gateway_Workers") or 1)
+STATS_INTERVAL = 1.0
+
+
+def enabled():
+    """Birden fazla worker istenmiş ve işletim sistemi SO_REUSEPORT destekliyor mu."""
+    if WORKERS <= 1:
+        return False
+    if not hasattr(socket, "SO_REUSEPORT"):
+        log.warning("SO_REUSEPORT desteklenmiyor, tek işlemli gateway kullanılacak.")
+        return False
+    return True
+
+
+async def run_worker(worker_id, ip_list, gw_port, local_port, stats_queue, stop_event):
+    from core.ClientHub import Gateway
+
+    gw = Gateway(ip_list, gw_port, None, local_port=local_port, reuse_port=True)
+    task = asyncio.create_task(gw.serve())
+    try:
+        while not stop_event.is_set() and not task.done():
+            await asyncio.sleep(STATS_INTERVAL)
+            stats_queue.put((worker_id, gw.stats()))
+    finally:
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+        stats_queue.put((worker_id, gw.stats()))
+
+
+def worker_main(worker_id, ip_list, gw_port, local_port, stats_queue, stop_event):
+    try:
+        asyncio.run(run_worker(worker_id, ip_list, gw_port, local_port, stats_queue, stop_event))
+    except KeyboardInterrupt:
+        pass
+
+
+class GatewayWorkers:
+    """Aynı Gateway_IP:Gateway_Port'a SO_REUSEPORT ile bağlanan N gateway işlemi.
+
+    Çekirdek gelen bağlantıları işlemler arasında dağıtır. Her worker
+    sayaçlarını bir kuyruğa yazar, stats() bunları toplar.
+    """
+
+    def __init__(self, ip_list, gw_port, count=WORKERS, local_port=None):
+        self.ip_list = list(ip_list)
+        self.target_port = gw_port
+        self.count = count
+        self.local_port = int(os.getenv("Gateway_Port")) if local_port is None else local_port
+        ctx = multiprocessing.get_context("spawn")
+        self.stats_queue = ctx.Queue()
+        self.stop_event = ctx.Event()
+        self.processes = [
+            ctx.Process(
+                target=worker_main,
+                args=(i, self.ip_list, gw_port, self.local_port, self.stats_queue, self.stop_event),
+                daemon=True
+            )
+            for i in range(count)
+        ]
+        self.worker_stats = {}
+        self.collector = None
+
+    def start(self):
+        for process in self.processes:
+            process.start()
+        self.collector = threading.Thread(target=self.collect, daemon=True)
+        self.collector.start()
+        log.info("%d gateway işlemi başlatıldı: port %s", self.count, self.local_port)
+
+    def collect(self):
+        while True:
+            try:
+                worker_id, stats = self.stats_queue.get(timeout=STATS_INTERVAL)
+            except queue.Empty:
+                if self.stop_event.is_set():
+                    return
+                continue
+            except (EOFError, OSError):
+                return
+            self.worker_stats[worker_id] = stats
+
+    def stats(self):
+        """Tüm worker'ların son sayaçlarının toplamı."""
+        total = {"workers": sum(p.is_alive() for p in self.processes)}
+        for stats in list(self.worker_stats.values()):
+            for key, value in stats.items():
+                total[key] = total.get(key, 0) + value
+        return total
+
+    def stop(self, timeout=5.0):
+        self.stop_event.set()
+        deadline = time.monotonic() + timeout
+        for process in self.processes:
+            process.join(max(0.0, deadline - time.monotonic()))
+            if process.is_alive():
+                process.terminate()
+        if self.collector:
+            self.collector.join(STATS_INTERVAL * 2)
@@ -33,9 +33,13 @@ class App:
     def load_data(self):
         path = get_resource_path("..", "data", "servers.json")
         self.data_from_gw = json.load(open(path))
-        self.servers = self.data_from_gw["network"]
+        # ID'ye göre sunucular; registry değişiklikleri satırı listeyi taramadan bulur.
+        self.servers = {server["ID"]: server for server in self.data_from_gw["network"]}
         self.info = self.data_from_gw["info"]
-        self.index_servers = {i: k["ID"] for i, k in zip(range(len(self.servers)), self.servers)}
+        self.index_servers = dict(enumerate(self.servers))
+        self.server_index = {server_id: i for i, server_id in self.index_servers.items()}
+        self.last_index = max(self.index_servers, default=6)
+        self.network_items = {}
         self.favorites = self.data_from_gw["favorites"]
 
     def setup_styles(self):
@@ -74,7 +78,23 @@ class App:
 
     def footer(self, frame):
         frame.pack(fill='x', side='bottom', expand=False)
-        CTkLabel(frame, text="Footer").pack()
+        self.footerLabel = CTkLabel(frame, text="Footer")
+        self.footerLabel.pack()
+        self.footerLabel.after(1000, self.updateFooter)
+
+    def updateFooter(self):
+        try:
+            stats = self.header.hub.gateway_stats()
+            if stats.get("sessions"):
+                self.footerLabel.configure(text=(
+                    f"Oturum: {stats.get('connections', 0)} | "
+                    f"↑ {stats.get('bytes_up', 0) / 1048576:.1f} MB  "
+                    f"↓ {stats.get('bytes_down', 0) / 1048576:.1f} MB | "
+                    f"Hata: {stats.get('failed_connects', 0) + stats.get('relay_errors', 0)}"
+                ))
+        except Exception as e:
+            print(e)
+        self.footerLabel.after(1000, self.updateFooter)
 
     def tabviewDraw(self, frame):
         frame.pack(fill='both', side='left', expand=True)
@@ -86,11 +106,12 @@ class App:
         self.tabview.pack(side='bottom', fill="both", expand=True)
 
     def refreshTreeview(self):
-        sorted_servers = sorted(self.servers, key=lambda s: s["ID"])
+        sorted_servers = sorted(self.servers.values(), key=lambda s: s["ID"])
         for item in self.treeviews["Network"].get_children():
             self.treeviews["Network"].delete(item)
+        self.network_items = {}
         for server in sorted_servers:
-            self.treeviews["Network"].insert(
+            self.network_items[server["ID"]] = self.treeviews["Network"].insert(
                 "", "end",
                 values=(
                     server["ID"],
@@ -103,28 +124,37 @@ class App:
             )
 
     def addServer(self, server):
-        # Sunucunun ID'si ile mevcut sunucular arasında kontrol yapalım
-        existing_server_index = None
-        for index, server_id in self.index_servers.items():
-            if server_id == server["ID"]:
-                existing_server_index = index
-                return existing_server_index, server
-
-        if existing_server_index is not None:
+        index = self.server_index.get(server["ID"])
+        if index is not None:
             # Mevcut sunucu bulunmuşsa, verilerini güncelle
-            self.updateServerInTreeview(existing_server_index, server)
-            return existing_server_index, server
-        else:
-            # Yeni sunucu ekle
-            next_index = max(self.index_servers.keys(), default=6) + 3
-            self.index_servers[next_index] = server["ID"]
-            self.addServerToTreeview(next_index, server)
-            return next_index, server
+            self.updateServerInTreeview(index, server)
+            return index, server
+        # Yeni sunucu ekle
+        self.last_index += 3
+        next_index = self.last_index
+        self.index_servers[next_index] = server["ID"]
+        self.server_index[server["ID"]] = next_index
+        self.addServerToTreeview(next_index, server)
+        return next_index, server
+
+    def removeServer(self, server_id):
+        index = self.server_index.pop(server_id, None)
+        if index is None:
+            return
+        self.index_servers.pop(index, None)
+        self.servers.pop(server_id, None)
+        item = self.network_items.pop(server_id, None)
+        if item and self.treeviews["Network"].exists(item):
+            self.treeviews["Network"].delete(item)
 
     def updateServerInTreeview(self, index, server):
         # Treeview'de mevcut sunucuyu güncelle
-        self.treeviews["Network"].item(index, values=(
-            index,
+        self.servers[server["ID"]] = server
+        item = self.network_items.get(server["ID"])
+        if not item or not self.treeviews["Network"].exists(item):
+            return
+        self.treeviews["Network"].item(item, values=(
+            self.treeviews["Network"].item(item, "values")[0],
             server["status"],
             server["name"],
             server["mode"],
@@ -134,8 +164,8 @@ class App:
 
     def addServerToTreeview(self, index, server):
         # Treeview'e yeni sunucu ekle
-        self.servers.append(server)
-        self.treeviews["Network"].insert(
+        self.servers[server["ID"]] = server
+        self.network_items[server["ID"]] = self.treeviews["Network"].insert(
             "", "end",
             values=(
                 index,
@@ -164,9 +194,9 @@ class App:
         self.treeviews[TabName].column("Map", width=80, anchor="center")
         self.treeviews[TabName].column("Players", width=100, anchor="w")
         if TabName == "Network":
-            for server in self.servers:
+            for server in self.servers.values():
                 status_icon = self.offline_img if server["status"].lower() == "offline" else self.online_img
-                item = self.treeviews[TabName].insert(
+                item = self.network_items[server["ID"]] = self.treeviews[TabName].insert(
                     "", "end",
                     values=(
                         server["ID"],
@@ -180,7 +210,9 @@ class App:
                 self.treeviews[TabName].item(item, image=status_icon)
         elif TabName == "Favorites":
             for server in self.favorites:
-                index, _ = self.addServer(server)
+                index = self.server_index.get(server["ID"])
+                if index is None:
+                    index, _ = self.addServer(server)
                 status_icon = self.offline_img if server["status"].lower() == "offline" else self.online_img
                 item = self.treeviews[TabName].insert(
                     "", "end",
@@ -209,9 +241,11 @@ class App:
                 itemid = self.treeviews[tabname].item(item, 'values')[0]
                 self.infoPanel.updateServerInfo(itemid)
                 self.header.updateServerInfo(itemid)
+            self.infoPanel.prefetchNeighbours(self.treeviews[tabname], selected[-1])
 
     def start(self):
         set_appearance_mode("system")
         set_default_color_theme("blue")
         self.draw()
-        self.root.mainloop()
\ No newline at end of file
+        self.root.mainloop()
+        self.header.hub.shutdown()
\ No newline at end of file
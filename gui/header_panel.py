@@ -1,6 +1,5 @@
 import os
 import sys
-import asyncio
 import threading
 import json
 from itertools import cycle
@@ -12,6 +11,7 @@ import pystray
 import webbrowser
 
 from core.ClientHub import HUB
+from core.runtime import TkBridge
 from utils.helper import get_hub_ip, get_resource_path
 from core.downloadGUI import AppDownload
 
@@ -23,8 +23,12 @@ class HeaderPanel:
         self.hub_ip = get_hub_ip()
         self.port = int(os.getenv("HUB_Port", 0))
         self.hub = HUB(self.hub_ip, self.port)
+        self.bridge = TkBridge(self.frame)
         self.selectedserver = None
         self.state = 0
+        self.server_changes = {}
+        self.changes_lock = threading.Lock()
+        self.hub.registry.subscribe(self.onServerChange)
         self.frame.after(500, self.startHUB)
 
     def hide_to_tray(self):
@@ -60,31 +64,28 @@ class HeaderPanel:
             print(f"[ERROR] Failed to start download window: {str(e)}")
 
     def startHUB(self):
-        def runner():
-            self.hub_loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(self.hub_loop)
-            self.hub.loop = self.hub_loop  # ÖNCE LOOP'U AYARLA
-            self.hub_loop.run_until_complete(self.hub.start())
-            
-        self.hub_thread = threading.Thread(target=runner, daemon=True)
-        self.hub_thread.start()
-
+        self.hub.launch()
         self.frame.after(1000, self.updateServerList)
-        self.frame.after(5000, lambda:self.hub.start_broadcast_listener())
-        
 
     def updateServerInfo(self, itemid):
-        self.selectedserver = None
-        for server in self.app.servers:
-            if server["ID"] == self.app.index_servers[int(itemid)]:
-                self.selectedserver = server
+        self.selectedserver = self.app.servers.get(self.app.index_servers[int(itemid)])
+
+    def onServerChange(self, event, server_id, server):
+        """HUB thread'inden gelir; Tk tarafı updateServerList'te uygular.
+        Aynı sunucunun ardışık değişiklikleri tek güncellemede birleşir."""
+        with self.changes_lock:
+            self.server_changes[server_id] = (event, server)
 
     def updateServerList(self):
         delay = 3000 + self.state * 10000
+        with self.changes_lock:
+            changes, self.server_changes = self.server_changes, {}
         try:
-            self.hub.scanServer()
-            for new in self.hub.servers_cache:
-                self.app.addServer(new)
+            for server_id, (event, server) in changes.items():
+                if event == "remove":
+                    self.app.removeServer(server_id)
+                else:
+                    self.app.addServer(server)
         except Exception as e:
             delay += 6000
             print(e)
@@ -94,16 +95,26 @@ class HeaderPanel:
     def startButton(self):
         if self.selectedserver:
             print("Start Server")
-            ips = self.selectedserver["IP"]
-            Port = self.selectedserver["Port"]
-            self.gateway = self.hub.startGateWay(ips, Port)
-            print(self.selectedserver)
+            server = self.selectedserver
             username, password = (self.username.get(), self.password.get())
-            self.hub.joinServer(self.selectedserver,username, password)
-            self.save_username_password(username, password)
-            self.state = 1
-            self.hide_to_tray()
-            self.run_process(self.selectedserver["repository"], "../Client") # download manageri açar
+            # Gateway runtime'da açılır; GUI beklemez, devamı onGatewayStarted'da.
+            self.bridge.run(
+                self.hub.runtime,
+                self.hub.start_gateway(server["IP"], server["Port"]),
+                lambda gateway: self.onGatewayStarted(gateway, server, username, password)
+            )
+
+    def onGatewayStarted(self, gateway, server, username, password):
+        self.gateway = gateway
+        print(server)
+        self.hub.joinServer(server, username, password)
+        self.save_username_password(username, password)
+        self.state = 1
+        self.hide_to_tray()
+        # Liste özet ise repository, seçimde yüklenen detaydan gelir.
+        repository = server.get("repository") or (self.hub.details.get(server["ID"]) or {}).get("repository")
+        if repository:
+            self.run_process(repository, "../Client") # download manageri açar
 
     def save_username_password(self, username, password):
         path = get_resource_path("..", "data", "servers.json")
@@ -124,9 +135,8 @@ class HeaderPanel:
         if not self.selectedserver:
             return
         server = self.selectedserver
-        inverse_index = {j: k for k, j in self.app.index_servers.items()}
         server_id = server["ID"]
-        server_index = inverse_index[server_id]
+        server_index = self.app.server_index[server_id]
         favorites_tree = self.app.treeviews["Favorites"]
         for item in favorites_tree.get_children():
             item_values = favorites_tree.item(item, "values")
@@ -4,8 +4,14 @@ from customtkinter import *
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 import matplotlib.pyplot as plt
 
+from core import console, details, history, prober
 from utils.image_utils import load_image_from_url
-from utils.helper import check_ping, get_resource_path
+from utils.helper import get_resource_path
+
+log = console.get("gui")
+
+# Seçilen satırın üstünde ve altında detayı önceden yüklenecek satır sayısı.
+PREFETCH_NEIGHBOURS = 2
 
 class InfoPanel:
     def __init__(self, app, frame):
@@ -47,25 +53,68 @@ class InfoPanel:
         self.ping_frame.pack(side='top', fill='both', expand=True, padx=10, pady=10)
         self.pingGraph = None
 
+    @property
+    def hub(self):
+        return self.app.header.hub
+
     def clickWebLink(self, e):
-        if self.selectedserver:
+        if self.selectedserver and self.selectedserver.get("web"):
             webbrowser.open_new(self.selectedserver["web"])
 
     def updateServerInfo(self, itemid):
-        self.selectedserver = None
-        for server in self.app.servers:
-            if server["ID"] == self.app.index_servers[int(itemid)]:
-                threading.Thread(target=self.load_banner_image, args=(server["banner"],), daemon=True).start()
-                self.selectedserver = server
-                break
+        server_id = self.app.index_servers[int(itemid)]
+        server = self.selectedserver = self.app.servers.get(server_id)
         if self.selectedserver:
-            self.infoTable["Rule"]["language"].configure(text=server["language"])
+            self.infoTable["Rule"]["language"].configure(text=server.get("language", "N/A"))
             self.infoTable["Rule"]["Mode"].configure(text=server["mode"])
-            self.infoTable["Rule"]["Web"].configure(text=server["web"])
             self.infoTable["Rule"]["Time"].configure(text="00:00")
             self.infoTable["Rule"]["Ping"].configure(text=server["ping"])
             self.infoTable["Rule"]["Map"].configure(text=server["map"])
-            self.draw_ping_graph(server["ping_last_1_hours"])
+            # Liste yalnızca özet alanları taşıyabilir; detaylar önbellekten ya da HUB'dan gelir.
+            detail = details.detail(server) or self.hub.details.get(server_id)
+            if detail:
+                self.showDetail(server, detail)
+                return
+            self.infoTable["Rule"]["Web"].configure(text="...")
+            self.app.header.bridge.run(
+                self.hub.runtime,
+                self.hub.server_detail(server_id),
+                lambda detail: self.showDetail(server, detail),
+                lambda e: self.detailFailed(server, e)
+            )
+
+    def showDetail(self, server, detail):
+        if self.selectedserver is not server:
+            return  # yanıt gelene kadar seçim değişti
+        server.update(detail)
+        threading.Thread(target=self.load_banner_image, args=(server, detail.get("banner")), daemon=True).start()
+        self.infoTable["Rule"]["Web"].configure(text=detail.get("web", "N/A"))
+        self.draw_ping_graph(self.ping_history(server, detail))
+
+    def ping_history(self, server, detail):
+        """Bu makinede kayıtlı son saatlik gecikmenin dakikalık ortalamaları, yoksa HUB'ın gönderdiği seri."""
+        local = history.read_averages(server["ID"])
+        if local:
+            return local
+        return detail.get("ping_last_1_hours") or []
+
+    def detailFailed(self, server, error):
+        log.info("Sunucu detayı alınamadı (%s): %r", server["ID"], error)
+        if self.selectedserver is server:
+            self.infoTable["Rule"]["Web"].configure(text="N/A")
+
+    def prefetchNeighbours(self, tree, item):
+        ids = []
+        before = after = item
+        for _ in range(PREFETCH_NEIGHBOURS):
+            before = tree.prev(before) if before else ""
+            after = tree.next(after) if after else ""
+            for neighbour in (before, after):
+                if neighbour:
+                    server_id = self.app.index_servers.get(int(tree.item(neighbour, "values")[0]))
+                    if server_id is not None and self.hub.details.get(server_id) is None:
+                        ids.append(server_id)
+        self.hub.prefetch(ids)
 
     def draw_ping_graph(self, ping_data):
         for widget in self.ping_frame.winfo_children():
@@ -98,13 +147,22 @@ class InfoPanel:
             canvas.get_tk_widget().pack(fill='both', expand=True)
         self.ping_frame.after(100, draw)
 
-    def load_banner_image(self, url):
+    def load_banner_image(self, server, url):
         img = load_image_from_url(url, "imgs/placeholder_server.png", (240, 300))
-        self.app.root.after(0, lambda: self.update_image(img))
+        bridge = self.app.header.bridge
+        bridge.post(self.update_image, img)
         try:
-            self.selectedserver["ping"] = check_ping(self.selectedserver["IP"]) 
-        except:
-            pass
+            ping = self.hub.runtime.submit(self.hub.ping_server(server)).result(timeout=prober.PROBE_TIMEOUT * 2 + 1)
+        except Exception as e:
+            log.info("Ping ölçülemedi (%s): %r", server["ID"], e)
+            return
+        if ping is not None:
+            server["ping"] = ping
+            bridge.post(self.showPing, server)
+
+    def showPing(self, server):
+        if self.selectedserver is server:
+            self.infoTable["Rule"]["Ping"].configure(text=server["ping"])
 
     def update_image(self, img):
         self.banner_server.configure(image=img)
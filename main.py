@@ -1,10 +1,7 @@
-import sys
+import multiprocessing
 from gui.app import App
-from utils.admin_check import is_admin, request_admin
 
 if __name__ == "__main__":
-    if not is_admin():
-        request_admin(sys.executable, __file__)
-        sys.exit()
+    multiprocessing.freeze_support()
     app = App()
     app.start()
\ No newline at end of file
@@ -3,7 +3,6 @@ import sys
 import time
 import requests
 
-from ping3 import ping
 from functools import lru_cache
 
 
@@ -26,21 +25,16 @@ def get_resource_path(*path_parts):
     return os.path.join(base_path, *path_parts)
 
 
-@lru_cache(3)
-def check_ping(ip_list):
-    _result = 0
-    for ip in ip_list:
-        response = ping(ip, timeout=2)
-        _result += response * 1000
-    return round(_result / len(ip_list), 2)
-
-
-def create_message(identifier, msg_type, data):
-    return {
+def create_message(identifier, msg_type, data, cid=None):
+    """cid verilirse HUB yanıtı aynı cid ile döner (bkz. HUB.request)."""
+    message = {
         "id": identifier,
         "timestamp": time.time(),
         "data": {"type": msg_type, **data}
     }
+    if cid is not None:
+        message["cid"] = cid
+    return message
 
 @lru_cache(5)
 def get_hub_ip(attempt = 0):